@@ -0,0 +1,44 @@
+"""
+Vorab-Aggregation für Balkendiagramme: ein Wert pro Kategorie statt einer Zeile pro Datensatz
+"""
+
+# Anzeigename -> pandas-Aggregationsfunktion
+AGGREGATIONS = {
+    "Summe": "sum",
+    "Mittelwert": "mean",
+    "Anzahl": "count",
+    "Minimum": "min",
+    "Maximum": "max",
+    "Keine": "",
+}
+
+OTHER_LABEL = "Sonstige"
+
+
+def aggregate(df, x_col, y_col, how, top_n=0):
+    """
+    Gruppiert df nach x_col und fasst y_col mit how zusammen.
+
+    Mit top_n > 0 bleiben nur die top_n Kategorien mit den größten Werten
+    erhalten; alle übrigen Zeilen werden zu einem Balken "Sonstige" zusammengefasst.
+    Zeilen ohne X-Wert zählen nicht mit. Bei nicht numerischen Y-Werten wird gezählt.
+    """
+    import pandas as pd
+
+    values = df[y_col]
+    groups = df[x_col]
+    if not pd.api.types.is_numeric_dtype(values):
+        # Summe oder Mittelwert von Text ergeben keinen sinnvollen Balken
+        how = "count"
+    grouped = values.groupby(groups, sort=False, observed=True).agg(how)
+    # Kategorie-Index in normale Werte umwandeln, damit "Sonstige" ergänzt werden kann
+    grouped.index = grouped.index.astype(object)
+
+    if top_n and len(grouped) > top_n:
+        top = grouped.nlargest(top_n)
+        # groupby lässt fehlende X-Werte weg, also auch nicht in "Sonstige" zählen
+        rest = values[~groups.isin(top.index) & groups.notna()]
+        other = pd.Series([rest.agg(how)], index=[OTHER_LABEL])
+        grouped = pd.concat([top, other])
+
+    return pd.DataFrame({x_col: grouped.index, y_col: grouped.to_numpy()})
@@ -0,0 +1,22 @@
+"""
+Verzeichnisse der Anwendung (Cache), unabhängig vom aktuellen Arbeitsverzeichnis
+"""
+
+import os
+import sys
+
+
+def cache_dir(*parts):
+    """Gibt ein Unterverzeichnis des App-Caches zurück und legt es bei Bedarf an"""
+    base = os.environ.get("DIAGRAMM_CACHE_DIR")
+    if not base:
+        if sys.platform == "win32":
+            root = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        elif sys.platform == "darwin":
+            root = os.path.expanduser("~/Library/Caches")
+        else:
+            root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        base = os.path.join(root, "diagramm-tool")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
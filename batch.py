@@ -0,0 +1,305 @@
+"""
+Kommandozeilen-Modus ohne GUI: erstellt viele Diagramme aus einer Job-Datei (JSON oder YAML)
+parallel in mehreren Prozessen. Jede Datei wird dabei nur einmal eingelesen, die
+Diagramme einer Datei werden anschließend parallel erstellt.
+
+Aufruf:
+    python batch.py jobs.yaml [-j 4] [--summary zusammenfassung.json]
+    python main.py --batch jobs.yaml ...
+
+Aufbau der Job-Datei:
+    defaults:                      # optional, gilt für alle Jobs
+      chart_type: Liniendiagramm
+    jobs:
+      - file: beispiel_daten.csv   # relativ zur Job-Datei
+        x: Monat
+        y: Umsatz
+        chart_type: Balkendiagramm
+        x_label: Monat             # optional: y_label, title, point_budget,
+        title: Umsatz 2024         # downsample_method, aggregation, top_n,
+        output: out/umsatz.html    # inline_plotlyjs, compact
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from aggregation import AGGREGATIONS
+from chart_builder import CHART_TYPES, DOWNSAMPLE_METHODS, ChartConfig, build_figure
+from chart_output import write_export
+from data_loader import read_header, read_table
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import pyarrow.feather as pa_feather
+except ImportError:
+    pa_feather = None
+
+REQUIRED_KEYS = ("file", "x", "y", "output")
+
+
+def load_spec(spec_path):
+    """Liest die Job-Datei und gibt die Jobs mit aufgelösten Pfaden zurück"""
+    with open(spec_path, "r", encoding="utf-8") as f:
+        if spec_path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ValueError("Für YAML-Job-Dateien wird PyYAML benötigt")
+            try:
+                spec = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Ungültiges YAML: {e}") from e
+        else:
+            spec = json.load(f)
+
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    if not isinstance(spec, dict):
+        raise ValueError("Erwartet wird eine Liste von Jobs oder ein Objekt mit \"jobs\"")
+    defaults = spec.get("defaults") or {}
+    if not isinstance(defaults, dict):
+        raise ValueError("\"defaults\" muss ein Objekt sein")
+    raw_jobs = spec.get("jobs") or []
+    if not isinstance(raw_jobs, list):
+        raise ValueError("\"jobs\" muss eine Liste sein")
+    base_dir = os.path.dirname(os.path.abspath(spec_path))
+
+    jobs = []
+    for index, raw_job in enumerate(raw_jobs):
+        if not isinstance(raw_job, dict):
+            raise ValueError(f"Job {index}: Erwartet wird ein Objekt mit file, x, y und output")
+        job = {**defaults, **raw_job, "index": index}
+        missing = [key for key in REQUIRED_KEYS if key not in job]
+        if missing:
+            raise ValueError(f"Job {index}: Angabe fehlt: {', '.join(missing)}")
+        if not all(isinstance(job[key], str) for key in ("file", "output")):
+            raise ValueError(f"Job {index}: file und output müssen Pfade sein")
+        job["file"] = os.path.join(base_dir, job["file"])
+        job["output"] = os.path.join(base_dir, job["output"])
+        jobs.append(job)
+    return jobs
+
+
+def job_config(job):
+    """Erstellt die ChartConfig eines Jobs; Namen wie in der Oberfläche sind erlaubt"""
+    chart_type = job.get("chart_type", CHART_TYPES[0])
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f"Unbekannter Diagrammtyp: {chart_type}")
+    options = {}
+    for key in ("x_label", "y_label", "title", "point_budget", "top_n"):
+        if job.get(key) is not None:
+            options[key] = job[key]
+    if "downsample_method" in job:
+        method = job["downsample_method"]
+        options["downsample_method"] = DOWNSAMPLE_METHODS.get(method, method)
+    if "aggregation" in job:
+        how = job["aggregation"] or ""
+        options["aggregation"] = AGGREGATIONS.get(how, how)
+    return ChartConfig(x_col=str(job["x"]), y_col=str(job["y"]), chart_type=chart_type, **options)
+
+
+def load_file(file_path, jobs):
+    """Liest die von den Jobs benötigten Spalten einer Datei; gibt (df, Sekunden) zurück"""
+    start = time.perf_counter()
+    # Nur vorhandene Spalten lesen; Jobs mit unbekannten Spalten scheitern einzeln
+    header = set(read_header(file_path))
+    columns = [c for c in dict.fromkeys(str(c) for job in jobs for c in (job["x"], job["y"]))
+               if c in header]
+    df = read_table(file_path, usecols=columns)
+    return df, time.perf_counter() - start
+
+
+def run_job(job, df, load_seconds):
+    """Erstellt die Figur eines Jobs aus den geladenen Daten und schreibt sie"""
+    timings = {}
+    try:
+        stage = time.perf_counter()
+        fig, info = build_figure(df, job_config(job))
+        timings["build_seconds"] = time.perf_counter() - stage
+
+        stage = time.perf_counter()
+        os.makedirs(os.path.dirname(job["output"]) or ".", exist_ok=True)
+        write_export(fig, job["output"],
+                     inline_plotlyjs=job.get("inline_plotlyjs", True),
+                     compact=job.get("compact", True))
+        timings["write_seconds"] = time.perf_counter() - stage
+    except KeyError as e:
+        return _result(job, False, f"Spalte nicht gefunden: {e}", load_seconds, **timings)
+    except Exception as e:
+        return _result(job, False, str(e), load_seconds, **timings)
+    return _result(job, True, "", load_seconds, rows=info.points_total,
+                   points_drawn=info.points_drawn, **timings)
+
+
+def run_file_jobs(file_path, jobs):
+    """
+    Verarbeitet alle Jobs einer Datei in einem Prozess: die Datei wird einmal
+    (nur mit den benötigten Spalten) gelesen, danach jede Figur erstellt und geschrieben.
+    """
+    start = time.perf_counter()
+    try:
+        df, load_seconds = load_file(file_path, jobs)
+    except Exception as e:
+        load_seconds = time.perf_counter() - start
+        return [_result(job, False, f"Fehler beim Laden: {e}", load_seconds) for job in jobs]
+    return [run_job(job, df, load_seconds) for job in jobs]
+
+
+def stage_file(file_path, jobs, stage_path):
+    """
+    Liest eine Datei für den Prozess-Pool einmal ein und legt die benötigten Spalten
+    unter stage_path ab; gibt (Spalten, Sekunden, Fehler) zurück.
+    """
+    start = time.perf_counter()
+    try:
+        df, load_seconds = load_file(file_path, jobs)
+        _write_stage(df, stage_path)
+    except Exception as e:
+        return None, time.perf_counter() - start, f"Fehler beim Laden: {e}"
+    return list(df.columns), load_seconds, ""
+
+
+def run_staged_job(job, stage_path, columns, load_seconds):
+    """Führt einen Job im Pool aus; gelesen werden nur seine Spalten der abgelegten Datei"""
+    try:
+        df = _read_stage(stage_path, [c for c in dict.fromkeys((str(job["x"]), str(job["y"])))
+                                      if c in columns])
+    except Exception as e:
+        return _result(job, False, f"Fehler beim Laden: {e}", load_seconds)
+    return run_job(job, df, load_seconds)
+
+
+def _write_stage(df, stage_path):
+    if pa_feather is not None:
+        pa_feather.write_feather(df.reset_index(drop=True), stage_path)
+    else:
+        df.to_pickle(stage_path)
+
+
+def _read_stage(stage_path, columns):
+    if pa_feather is not None:
+        return pa_feather.read_feather(stage_path, columns=columns, memory_map=True)
+    return pd.read_pickle(stage_path)[columns]
+
+
+def _result(job, ok, error, load_seconds, **details):
+    """Ergebnis eines Jobs für die Zusammenfassung"""
+    result = {
+        "index": job["index"],
+        "file": job["file"],
+        "output": job["output"],
+        "chart_type": job.get("chart_type", CHART_TYPES[0]),
+        "ok": ok,
+        "error": error,
+        # Die Datei wird für alle ihre Jobs gemeinsam geladen
+        "load_seconds": round(load_seconds, 4),
+    }
+    for key, value in details.items():
+        result[key] = round(value, 4) if isinstance(value, float) else value
+    result["total_seconds"] = round(
+        load_seconds + details.get("build_seconds", 0) + details.get("write_seconds", 0), 4
+    )
+    return result
+
+
+def run_jobs(jobs, workers):
+    """
+    Verteilt die Jobs auf einen Prozess-Pool. Jede Datei wird einmal gelesen und
+    zwischengespeichert; Erstellen und Schreiben der Figuren laufen danach je Job
+    parallel, auch wenn alle Jobs dieselbe Datei verwenden.
+    """
+    by_file = {}
+    for job in jobs:
+        by_file.setdefault(job["file"], []).append(job)
+
+    if workers <= 1 or len(jobs) <= 1:
+        results = []
+        for file_path, file_jobs in by_file.items():
+            results.extend(run_file_jobs(file_path, file_jobs))
+        return sorted(results, key=lambda result: result["index"])
+
+    file_futures = []
+    job_futures = []
+    with tempfile.TemporaryDirectory(prefix="diagramm-batch-") as stage_dir, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        staging = {}
+        for number, (file_path, file_jobs) in enumerate(by_file.items()):
+            if len(file_jobs) == 1:
+                # Ein einzelner Job braucht keine Zwischenablage
+                file_futures.append(pool.submit(run_file_jobs, file_path, file_jobs))
+                continue
+            stage_path = os.path.join(stage_dir, f"{number}.data")
+            future = pool.submit(stage_file, file_path, file_jobs, stage_path)
+            staging[future] = (file_jobs, stage_path)
+
+        results = []
+        # Sobald eine Datei gelesen ist, werden ihre Jobs auf den Pool verteilt
+        for future in as_completed(staging):
+            file_jobs, stage_path = staging[future]
+            columns, load_seconds, error = future.result()
+            if error:
+                results.extend(_result(job, False, error, load_seconds) for job in file_jobs)
+                continue
+            job_futures.extend(
+                pool.submit(run_staged_job, job, stage_path, columns, load_seconds)
+                for job in file_jobs
+            )
+        for future in file_futures:
+            results.extend(future.result())
+        results.extend(future.result() for future in job_futures)
+    return sorted(results, key=lambda result: result["index"])
+
+
+def print_summary(results, wall_seconds):
+    """Gibt eine Zeile pro Job und die Gesamtdauer aus"""
+    for result in results:
+        status = "OK    " if result["ok"] else "FEHLER"
+        line = f"{status} {result['total_seconds']:>8.2f}s  {result['output']}"
+        if result["error"]:
+            line += f"  ({result['error']})"
+        print(line)
+    failed = sum(not result["ok"] for result in results)
+    print(f"{len(results) - failed} von {len(results)} Diagrammen erstellt in {wall_seconds:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="batch.py",
+        description="Erstellt Diagramme ohne GUI aus einer Job-Datei (JSON oder YAML)"
+    )
+    parser.add_argument("spec", help="Job-Datei (.json, .yaml oder .yml)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Anzahl paralleler Prozesse (Standard: Anzahl CPUs)")
+    parser.add_argument("--summary", help="Zusammenfassung als JSON schreiben "
+                                          "(Standard: <Job-Datei>.summary.json)")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_spec(args.spec)
+    except (OSError, ValueError) as e:
+        print(f"Fehler in der Job-Datei: {e}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    results = run_jobs(jobs, args.jobs)
+    wall_seconds = time.perf_counter() - start
+
+    summary_path = args.summary or os.path.splitext(args.spec)[0] + ".summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump({"wall_seconds": round(wall_seconds, 4), "jobs": results}, f,
+                  indent=2, ensure_ascii=False)
+    print_summary(results, wall_seconds)
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
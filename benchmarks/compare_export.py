@@ -0,0 +1,66 @@
+"""
+Vergleicht Größe und Dauer des HTML-Exports: plotly write_html gegen die kompakte
+Kodierung (base64-Typed-Arrays) mit und ohne gzip.
+
+Aufruf: python benchmarks/compare_export.py [--rows 1000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chart_builder import ChartConfig, build_figure
+from chart_output import write_export, orjson
+
+
+def timed_write(write, path):
+    """Schreibt die Datei und gibt (Sekunden, Bytes) zurück"""
+    start = time.perf_counter()
+    write(path)
+    return time.perf_counter() - start, os.path.getsize(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"JSON-Encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'Zeilen':>10}  {'Spalte':<10}{'Variante':<18}{'Sekunden':>10}{'MB':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            rng = np.random.default_rng(0)
+            df = pd.DataFrame({
+                "Index": np.arange(rows),
+                # Ganzzahlige Beträge wie in beispiel_daten.csv und Messwerte mit voller Genauigkeit
+                "Umsatz": rng.normal(60000, 15000, rows).round().astype(np.int64),
+                "Messwert": rng.normal(0, 1, rows),
+            })
+            for y_col in ("Umsatz", "Messwert"):
+                compare(df, y_col, rows, directory)
+
+
+def compare(df, y_col, rows, directory):
+    """Schreibt eine Figur in allen Varianten und gibt eine Tabellenzeile je Variante aus"""
+    # Ohne Ausdünnung, damit alle Zeilen serialisiert werden
+    fig, _ = build_figure(df, ChartConfig("Index", y_col, point_budget=0))
+
+    variants = [
+        ("write_html", ".html", lambda p: fig.write_html(p)),
+        ("kompakt", ".html", lambda p: write_export(fig, p)),
+        ("kompakt + gzip", ".html.gz", lambda p: write_export(fig, p)),
+    ]
+    for index, (name, suffix, write) in enumerate(variants):
+        path = os.path.join(directory, f"{rows}-{y_col}-{index}{suffix}")
+        seconds, size = timed_write(write, path)
+        print(f"{rows:>10}  {y_col:<10}{name:<18}{seconds:>10.3f}{size / 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
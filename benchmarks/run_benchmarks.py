@@ -0,0 +1,348 @@
+"""
+Reproduzierbare Messung von Laden, Diagramm-Erstellung und HTML-Export.
+
+Erzeugt synthetische Tabellen im Aufbau von beispiel_daten.csv (schmal: 5 Spalten,
+breit: 50 Spalten) als CSV und Excel und misst für jeden Diagrammtyp getrennt:
+
+- parse_seconds:     Laden über den LoadWorker im Qt-Thread, wie "Datei öffnen"
+                     (ohne Tabellen-Cache)
+- build_seconds:     build_figure, wie "Diagramm erstellen"
+- serialize_seconds: write_export mit den Standardeinstellungen, wie "Als HTML exportieren"
+
+dazu den Spitzenspeicher des Prozesses und die Größe der HTML-Datei. Jeder Fall läuft
+in einem eigenen Prozess ohne Fenster und Dialoge (Qt-Plattform "offscreen").
+
+Aufruf:
+    python benchmarks/run_benchmarks.py [--rows 1e3 1e4 1e5 1e6 1e7] [--formats csv xlsx]
+                                        [--shapes schmal breit] [--chart-types ...]
+                                        [--save-baseline] [--baseline pfad]
+
+Die Ergebnisse werden als JSON geschrieben (--output). Liegt eine Baseline vor,
+werden die Werte damit verglichen; Verschlechterungen über --tolerance hinaus
+führen zum Rückgabewert 1. Kurze Zeiten und kleine absolute Unterschiede gelten
+als Rauschen (MIN_SECONDS, MIN_DELTA).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # Unter Windows gibt es kein resource-Modul, der Speicher wird dann nicht gemessen
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app_paths import cache_dir
+from chart_builder import CHART_TYPES
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+FORMATS = ("csv", "xlsx")
+SHAPES = ("schmal", "breit")
+
+# Breite Tabellen haben zusätzlich so viele Kennzahl-Spalten
+WIDE_EXTRA_COLUMNS = 45
+
+MONTHS = ["Januar", "Februar", "März", "April", "Mai", "Juni", "Juli",
+          "August", "September", "Oktober", "November", "Dezember"]
+
+# Verglichene Werte
+METRICS = ("parse_seconds", "build_seconds", "serialize_seconds", "peak_rss_mb", "output_bytes")
+
+# Zeiten unter MIN_SECONDS gelten als Rauschen; außerdem muss eine Verschlechterung
+# absolut mehr als MIN_DELTA (Sekunden bzw. MB) betragen
+MIN_SECONDS = 0.1
+MIN_DELTA = {"parse_seconds": 0.1, "build_seconds": 0.1, "serialize_seconds": 0.1,
+             "peak_rss_mb": 10}
+
+# Wiederholungen je Fall, von denen der beste Wert zählt
+DEFAULT_REPEAT = 3
+
+
+def parse_rows(value):
+    """Zeilenzahl, auch in der Schreibweise 1e6"""
+    return int(float(value))
+
+
+def dataset_path(data_dir, fmt, shape, rows):
+    """Erzeugt die Testdatei bei Bedarf (deterministisch) und gibt ihren Pfad zurück"""
+    path = os.path.join(data_dir, f"daten-{shape}-{rows}.{fmt}")
+    if os.path.exists(path):
+        return path
+
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(rows)
+    umsatz = rng.normal(55_000, 10_000, rows).round().astype(np.int64)
+    kosten = (umsatz * rng.uniform(0.5, 0.7, rows)).round().astype(np.int64)
+    columns = {
+        "Monat": np.array(MONTHS)[np.arange(rows) % len(MONTHS)],
+        "Umsatz": umsatz,
+        "Kosten": kosten,
+        "Gewinn": umsatz - kosten,
+        "Mitarbeiter": rng.integers(10, 20, rows),
+    }
+    if shape == "breit":
+        for index in range(1, WIDE_EXTRA_COLUMNS + 1):
+            columns[f"Kennzahl_{index:02d}"] = rng.normal(100, 25, rows).round(2)
+    df = pd.DataFrame(columns)
+
+    # Erst vollständig schreiben, dann umbenennen, damit abgebrochene Läufe nichts hinterlassen
+    tmp_path = os.path.join(data_dir, f"tmp-{os.getpid()}-{os.path.basename(path)}")
+    if fmt == "csv":
+        df.to_csv(tmp_path, index=False)
+    else:
+        df.to_excel(tmp_path, index=False, engine="openpyxl")
+    os.replace(tmp_path, path)
+    return path
+
+
+def peak_rss_mb():
+    """Bisheriger Spitzenspeicher des Prozesses in MB (None ohne resource-Modul)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def timed_load(file_path):
+    """Lädt die Datei wie die Oberfläche über den LoadWorker in einem QThread"""
+    from PyQt5.QtCore import QCoreApplication, QEventLoop, QThread
+    from load_worker import LoadWorker
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    loop = QEventLoop()
+    result = {}
+
+    def on_finished(df):
+        result["df"] = df
+        loop.quit()
+
+    def on_failed(message):
+        result["error"] = message
+        loop.quit()
+
+    thread = QThread()
+    worker = LoadWorker(file_path, use_cache=False)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.finished.connect(on_finished)
+    worker.failed.connect(on_failed)
+
+    start = time.perf_counter()
+    thread.start()
+    loop.exec_()
+    seconds = time.perf_counter() - start
+    thread.quit()
+    thread.wait()
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result["df"], seconds
+
+
+def run_case(case):
+    """Misst einen Fall (Datei und Diagrammtyp) in einem eigenen Prozess"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = dict(case)
+
+    # Module vorab laden wie warm_up() in main.py, damit sie nicht in die Stufen eingehen
+    start = time.perf_counter()
+    import plotly.express  # noqa: F401
+    import data_loader  # noqa: F401
+    import downsampling  # noqa: F401
+    from chart_builder import ChartConfig, build_figure
+    from chart_output import write_export
+    # Einmalige Kosten der ersten Figur (Vorlagen, Validatoren) ebenfalls vorab
+    warm_up, _ = build_figure(data_loader.pd.DataFrame({"Monat": ["Januar"], "Umsatz": [1]}),
+                              ChartConfig("Monat", "Umsatz", case["chart_type"]))
+    with tempfile.TemporaryDirectory() as directory:
+        write_export(warm_up, os.path.join(directory, "warm-up.html"))
+    result["import_seconds"] = time.perf_counter() - start
+    result["import_rss_mb"] = peak_rss_mb()
+
+    df, result["parse_seconds"] = timed_load(case["file"])
+    result["parse_rss_mb"] = peak_rss_mb()
+
+    start = time.perf_counter()
+    fig, info = build_figure(df, ChartConfig("Monat", "Umsatz", case["chart_type"]))
+    result["build_seconds"] = time.perf_counter() - start
+    result["points_drawn"] = info.points_drawn
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "diagramm.html")
+        start = time.perf_counter()
+        write_export(fig, output)
+        result["serialize_seconds"] = time.perf_counter() - start
+        result["output_bytes"] = os.path.getsize(output)
+
+    result["peak_rss_mb"] = peak_rss_mb()
+    for key in ("import_seconds", "parse_seconds", "build_seconds", "serialize_seconds"):
+        result[key] = round(result[key], 4)
+    return result
+
+
+def best_of(runs):
+    """Fasst Wiederholungen zusammen: jeweils der kleinste Wert"""
+    result = dict(runs[0])
+    for key in ("import_seconds", "parse_seconds", "build_seconds", "serialize_seconds",
+                "import_rss_mb", "parse_rss_mb", "peak_rss_mb"):
+        values = [run[key] for run in runs if run[key] is not None]
+        result[key] = min(values) if values else None
+    return result
+
+
+def case_key(result):
+    return f"{result['format']}/{result['shape']}/{result['rows']}/{result['chart_type']}"
+
+
+def compare(results, baseline, tolerance):
+    """Vergleicht die Messwerte mit der Baseline; Verhältnis > 1 bedeutet schlechter"""
+    previous = {case_key(result): result for result in baseline["results"]}
+    cases = []
+    regressions = 0
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        metrics = {}
+        for metric in METRICS:
+            new_value, old_value = result.get(metric), old.get(metric)
+            if not new_value or not old_value:
+                continue
+            ratio = new_value / old_value
+            noise = ((metric.endswith("_seconds") and max(new_value, old_value) < MIN_SECONDS)
+                     or new_value - old_value <= MIN_DELTA.get(metric, 0))
+            regression = ratio > 1 + tolerance and not noise
+            regressions += regression
+            metrics[metric] = {"baseline": old_value, "current": new_value,
+                               "ratio": round(ratio, 3), "regression": regression}
+        cases.append({"case": case_key(result), "metrics": metrics})
+    return {"tolerance": tolerance, "regressions": regressions, "cases": cases}
+
+
+def environment():
+    """Angaben zur Umgebung, damit Ergebnisse vergleichbar bleiben"""
+    import pandas
+    import plotly
+    from chart_output import orjson
+    from data_loader import pa
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pandas.__version__,
+        "plotly": plotly.__version__,
+        "pyarrow": pa.__version__ if pa is not None else None,
+        "orjson": orjson is not None,
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def print_table(results, comparison):
+    """Gibt eine Zeile pro Fall aus, mit Verhältnis zur Baseline falls vorhanden"""
+    ratios = {case["case"]: case["metrics"] for case in (comparison or {}).get("cases", [])}
+    print(f"{'Fall':<52}{'Laden':>9}{'Figur':>9}{'Export':>9}{'MB RSS':>9}{'MB HTML':>9}")
+    for result in results:
+        key = case_key(result)
+        line = (f"{key:<52}{result['parse_seconds']:>9.3f}{result['build_seconds']:>9.3f}"
+                f"{result['serialize_seconds']:>9.3f}{result['peak_rss_mb'] or 0:>9.0f}"
+                f"{result['output_bytes'] / 1e6:>9.2f}")
+        worse = [f"{metric} x{values['ratio']}" for metric, values in ratios.get(key, {}).items()
+                 if values["regression"]]
+        if worse:
+            line += "  SCHLECHTER: " + ", ".join(worse)
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="run_benchmarks.py",
+        description="Misst Laden, Diagramm-Erstellung und HTML-Export ohne GUI"
+    )
+    parser.add_argument("--rows", type=parse_rows, nargs="+", default=DEFAULT_ROWS,
+                        help="Zeilenzahlen, z. B. 1e3 1e5 1e7")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--chart-types", nargs="+", choices=CHART_TYPES, default=CHART_TYPES,
+                        metavar="TYP", help="Diagrammtypen (Standard: alle)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Wiederholungen je Fall; verwendet wird der beste Wert "
+                             f"(Standard: {DEFAULT_REPEAT})")
+    parser.add_argument("--xlsx-max-rows", type=parse_rows, default=100_000,
+                        help="Größere Excel-Dateien auslassen (Excel erlaubt max. 1.048.576 Zeilen)")
+    parser.add_argument("--wide-max-rows", type=parse_rows, default=1_000_000,
+                        help="Größere breite Tabellen auslassen")
+    parser.add_argument("--data-dir", default=None,
+                        help="Ablage der erzeugten Testdateien (Standard: App-Cache)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Ergebnisse als JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline zum Vergleich")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Ergebnisse als neue Baseline speichern")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Erlaubte Verschlechterung, 0.2 = 20 %%")
+    args = parser.parse_args(argv)
+
+    data_dir = args.data_dir or cache_dir("benchmarks")
+    os.makedirs(data_dir, exist_ok=True)
+    # Jeder Fall bekommt einen neuen Prozess, damit Spitzenspeicher und Importe nicht
+    # von vorherigen Fällen beeinflusst werden
+    context = multiprocessing.get_context("spawn")
+
+    results = []
+    for fmt in args.formats:
+        for shape in args.shapes:
+            for rows in args.rows:
+                if (fmt == "xlsx" and rows > args.xlsx_max_rows) \
+                        or (shape == "breit" and rows > args.wide_max_rows):
+                    continue
+                file_path = dataset_path(data_dir, fmt, shape, rows)
+                for chart_type in args.chart_types:
+                    case = {"format": fmt, "shape": shape, "rows": rows,
+                            "chart_type": chart_type, "file": file_path,
+                            "input_bytes": os.path.getsize(file_path)}
+                    runs = []
+                    for _ in range(max(1, args.repeat)):
+                        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                            runs.append(pool.submit(run_case, case).result())
+                    # Ohne Ablageort, damit die Baseline nicht vom Rechner abhängt
+                    results.append({**best_of(runs), "file": os.path.basename(file_path)})
+                    print(f"{case_key(case)} fertig", file=sys.stderr)
+
+    report = {"environment": environment(), "results": results}
+    comparison = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            comparison = compare(results, json.load(f), args.tolerance)
+        comparison["baseline"] = args.baseline
+        report["comparison"] = comparison
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print_table(results, comparison)
+    if comparison is not None:
+        print(f"{comparison['regressions']} Verschlechterungen gegenüber {args.baseline}")
+        return 1 if comparison["regressions"] else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Erstellt Plotly-Figuren aus einem DataFrame, unabhängig von der Oberfläche
+"""
+
+from dataclasses import dataclass, replace
+from aggregation import OTHER_LABEL, aggregate
+from profiling import span
+
+CHART_TYPES = [
+    "Liniendiagramm",
+    "Balkendiagramm",
+    "Streudiagramm",
+    "Flächendiagramm",
+    "Balkendiagramm (horizontal)"
+]
+
+# Ab dieser Punktzahl werden Linien-, Flächen- und Streudiagramme ausgedünnt
+DEFAULT_POINT_BUDGET = 50_000
+
+DOWNSAMPLE_METHODS = {
+    "LTTB": "lttb",
+    "Min/Max": "minmax",
+}
+
+
+@dataclass(frozen=True)
+class ChartConfig:
+    """Konfiguration eines Diagramms, wie sie in der Oberfläche eingestellt wird"""
+    x_col: str
+    y_col: str
+    chart_type: str = "Liniendiagramm"
+    x_label: str = ""
+    y_label: str = ""
+    title: str = ""
+    point_budget: int = DEFAULT_POINT_BUDGET
+    downsample_method: str = "lttb"
+    aggregation: str = "sum"
+    top_n: int = 0
+
+
+@dataclass
+class ChartInfo:
+    """Angaben zur erstellten Figur für Titel und Statusleiste"""
+    points_total: int
+    points_drawn: int
+    webgl: bool = False
+    aggregated: bool = False
+
+    @property
+    def downsampled(self):
+        return self.points_drawn < self.points_total
+
+    def summary(self):
+        """Kurzer Text für die Statusleiste"""
+        drawn = f"{self.points_drawn:,}".replace(',', '.')
+        total = f"{self.points_total:,}".replace(',', '.')
+        if self.aggregated:
+            return f"{drawn} Balken aus {total} Zeilen"
+        if not self.downsampled:
+            return f"{drawn} Punkte gezeichnet"
+        return f"{drawn} von {total} Punkten gezeichnet, WebGL"
+
+
+def build_figure(df, config):
+    """Erstellt die Figur für df gemäß config und gibt (fig, ChartInfo) zurück"""
+    # Erst hier importiert, damit der Programmstart nicht auf plotly warten muss
+    import plotly.express as px
+    from downsampling import downsample
+
+    x_col, y_col = config.x_col, config.y_col
+    chart_type = config.chart_type
+
+    data = df[list(dict.fromkeys((x_col, y_col)))]
+    info = ChartInfo(points_total=len(data), points_drawn=len(data))
+
+    # Große Linien-, Flächen- und Streudiagramme ausdünnen und per WebGL zeichnen
+    if chart_type in ("Liniendiagramm", "Flächendiagramm", "Streudiagramm") \
+            and config.point_budget and len(data) > config.point_budget:
+        method = "scatter" if chart_type == "Streudiagramm" else config.downsample_method
+        with span("Ausdünnen", method=method, rows=len(data)):
+            data = downsample(data, x_col, y_col, config.point_budget, method)
+        info.points_drawn = len(data)
+        info.webgl = True
+    # Balkendiagramme vorab zu einem Wert pro Kategorie zusammenfassen
+    elif chart_type in ("Balkendiagramm", "Balkendiagramm (horizontal)") and config.aggregation:
+        with span("Aggregieren", how=config.aggregation, rows=len(data)):
+            data = aggregate(data, x_col, y_col, config.aggregation, config.top_n)
+        info.points_drawn = len(data)
+        info.aggregated = True
+    render_mode = 'webgl' if info.webgl else 'auto'
+
+    # Diagramm erstellen basierend auf Typ
+    with span("Figur erstellen (plotly)", chart_type=chart_type, points=info.points_drawn):
+        if chart_type == "Liniendiagramm":
+            fig = px.line(data, x=x_col, y=y_col, render_mode=render_mode)
+        elif chart_type == "Balkendiagramm":
+            fig = px.bar(data, x=x_col, y=y_col)
+        elif chart_type == "Streudiagramm":
+            fig = px.scatter(data, x=x_col, y=y_col, render_mode=render_mode)
+        elif chart_type == "Flächendiagramm":
+            if info.webgl:
+                # px.area kennt kein WebGL; Scattergl mit Füllung bis zur Nulllinie
+                fig = px.line(data, x=x_col, y=y_col, render_mode='webgl')
+                fig.update_traces(fill='tozeroy')
+            else:
+                fig = px.area(data, x=x_col, y=y_col)
+        elif chart_type == "Balkendiagramm (horizontal)":
+            fig = px.bar(data, x=y_col, y=x_col, orientation='h')
+        else:
+            raise ValueError(f"Unbekannter Diagrammtyp: {chart_type}")
+
+        if info.aggregated and config.top_n and len(data) and data[x_col].iloc[-1] == OTHER_LABEL:
+            # Mit "Sonstige" würde der Balken bei Zahlen- oder Datumsachsen nicht gezeichnet
+            if chart_type == "Balkendiagramm (horizontal)":
+                fig.update_yaxes(type='category')
+            else:
+                fig.update_xaxes(type='category')
+
+        # Layout anpassen
+        fig.update_layout(
+            hovermode='closest',
+            template='plotly_white',
+            height=600
+        )
+    apply_labels(fig, config, info)
+    return fig, info
+
+
+def apply_labels(fig, config, info):
+    """Setzt Titel und Achsenbeschriftungen; ändert nur das Layout, nicht die Daten"""
+    x_label = config.x_label or config.x_col
+    y_label = config.y_label or config.y_col
+    title = config.title or f"{y_label} vs {x_label}"
+    if info.downsampled:
+        title = f"{title}<br><sup>{info.summary()}</sup>"
+    if config.chart_type == "Balkendiagramm (horizontal)":
+        x_label, y_label = y_label, x_label  # Achsen tauschen
+
+    fig.update_layout(title_text=title)
+    fig.update_xaxes(title_text=x_label)
+    fig.update_yaxes(title_text=y_label)
+
+
+def data_config(config):
+    """Der Teil der Konfiguration, der die Daten der Figur bestimmt (ohne Beschriftungen)"""
+    return replace(config, x_label="", y_label="", title="")
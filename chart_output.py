@@ -0,0 +1,268 @@
+"""
+Schreibt Diagramme als HTML. Vorschauen verweisen auf ein gemeinsames plotly.js
+im App-Cache und liegen in einem begrenzten Verzeichnis, das regelmäßig aufgeräumt wird.
+Zahlenreihen werden kompakt als base64-kodierte Typed Arrays eingebettet.
+"""
+
+import base64
+import gzip
+import os
+import tempfile
+import uuid
+import numpy as np
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from app_paths import cache_dir
+from profiling import span
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Grenzen für das Vorschau-Verzeichnis; ältere Dateien werden zuerst gelöscht
+MAX_PREVIEW_FILES = 50
+MAX_PREVIEW_BYTES = 200 * 1024 * 1024
+
+PREVIEW_PREFIX = "diagramm-"
+
+# Kürzere Zahlenreihen bleiben normale JSON-Listen
+COMPACT_MIN_LENGTH = 64
+
+# numpy-Typ -> Kürzel, das der Decoder im Browser auf ein Typed Array abbildet
+TYPED_ARRAY_CODES = {
+    np.dtype('float64'): 'f8',
+    np.dtype('float32'): 'f4',
+    np.dtype('int32'): 'i4',
+    np.dtype('int16'): 'i2',
+    np.dtype('int8'): 'i1',
+    np.dtype('uint32'): 'u4',
+    np.dtype('uint16'): 'u2',
+    np.dtype('uint8'): 'u1',
+}
+
+# Wandelt {dtype, bdata} vor dem Zeichnen in Typed Arrays um; funktioniert auch
+# mit plotly.js-Versionen, die base64-Daten noch nicht selbst dekodieren
+DECODER_JS = """
+var DTYPES = {f8: Float64Array, f4: Float32Array, i4: Int32Array, i2: Int16Array,
+              i1: Int8Array, u4: Uint32Array, u2: Uint16Array, u1: Uint8Array};
+function decodeTypedArrays(value) {
+    if (Array.isArray(value)) {
+        for (var i = 0; i < value.length; i++) {
+            if (value[i] !== null && typeof value[i] === 'object') value[i] = decodeTypedArrays(value[i]);
+        }
+        return value;
+    }
+    if (value === null || typeof value !== 'object') return value;
+    if (typeof value.bdata === 'string' && DTYPES[value.dtype]) {
+        var raw = atob(value.bdata), bytes = new Uint8Array(raw.length);
+        for (var j = 0; j < raw.length; j++) bytes[j] = raw.charCodeAt(j);
+        return new DTYPES[value.dtype](bytes.buffer);
+    }
+    for (var key in value) value[key] = decodeTypedArrays(value[key]);
+    return value;
+}
+"""
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8" />{script}</head>
+<body>
+<div id="{div_id}" class="plotly-graph-div" style="height:100%; width:100%;"></div>
+<script type="text/javascript">
+(function() {{
+{decoder}
+var figure = {payload};
+Plotly.newPlot("{div_id}", decodeTypedArrays(figure.data), figure.layout, figure.config);
+}})();
+</script>
+</body>
+</html>
+"""
+
+
+def preview_dir():
+    """Verzeichnis für Vorschaudateien und das gemeinsame plotly.js"""
+    return cache_dir("charts")
+
+
+def plotly_js_name():
+    """Dateiname des plotly.js-Bundles, versioniert nach der plotly.js-Version"""
+    return f"plotly-{get_plotlyjs_version()}.min.js"
+
+
+def ensure_plotly_js():
+    """Schreibt plotly.js einmalig in das Vorschau-Verzeichnis und gibt den Pfad zurück"""
+    path = os.path.join(preview_dir(), plotly_js_name())
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return path
+
+
+def write_preview(fig):
+    """
+    Schreibt eine Vorschau-Datei, die plotly.js nur referenziert, und
+    gibt ihren Pfad zurück
+    """
+    ensure_plotly_js()
+    with tempfile.NamedTemporaryFile('w', delete=False, dir=preview_dir(),
+                                     prefix=PREVIEW_PREFIX, suffix='.html',
+                                     encoding='utf-8') as f:
+        # Relativer Pfad, da plotly.js im selben Verzeichnis liegt
+        with span("HTML serialisieren"):
+            html = compact_html(fig, include_plotlyjs=plotly_js_name())
+        with span("Datei schreiben", bytes=len(html)):
+            f.write(html)
+    prune_previews()
+    return f.name
+
+
+def write_export(fig, file_path, inline_plotlyjs=True, compact=True):
+    """
+    Exportiert die Figur. Mit inline_plotlyjs ist die Datei eigenständig
+    (ca. 3,5 MB plotly.js), sonst wird plotly.js vom CDN geladen.
+    Endet file_path auf .gz, wird die Datei gzip-komprimiert geschrieben.
+    """
+    include_plotlyjs = True if inline_plotlyjs else 'cdn'
+    with span("HTML serialisieren", compact=compact):
+        if compact:
+            html = compact_html(fig, include_plotlyjs=include_plotlyjs)
+        else:
+            html = fig.to_html(include_plotlyjs=include_plotlyjs)
+
+    with span("Datei schreiben", bytes=len(html), gzip=file_path.endswith('.gz')):
+        if file_path.endswith('.gz'):
+            with gzip.open(file_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                f.write(html)
+        else:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(html)
+
+
+def compact_html(fig, include_plotlyjs=True):
+    """
+    Erzeugt eine vollständige HTML-Seite, in der Zahlenreihen als base64-Typed-Arrays
+    eingebettet sind. include_plotlyjs wie bei fig.write_html: True, 'cdn' oder ein Pfad.
+    """
+    figure = fig.to_plotly_json()
+    payload = {
+        'data': [encode_arrays(trace) for trace in figure.get('data', [])],
+        'layout': figure.get('layout', {}),
+        'config': {'responsive': True},
+    }
+    return HTML_TEMPLATE.format(
+        script=_plotly_script_tag(include_plotlyjs),
+        div_id=str(uuid.uuid4()),
+        decoder=DECODER_JS,
+        payload=figure_json(payload)
+    )
+
+
+def traces_json(fig):
+    """Die Traces der Figur als JSON mit kompakt kodierten Zahlenreihen"""
+    return figure_json([encode_arrays(trace.to_plotly_json()) for trace in fig.data])
+
+
+def figure_json(obj):
+    """JSON-Kodierung über plotly, mit orjson falls installiert"""
+    return to_json_plotly(obj, engine='orjson' if orjson is not None else 'json')
+
+
+def encode_arrays(value):
+    """Ersetzt eindimensionale Zahlenreihen in einer Trace durch {dtype, bdata}"""
+    if isinstance(value, dict):
+        return {key: encode_arrays(item) for key, item in value.items()}
+    if isinstance(value, (np.ndarray, list, tuple)) and len(value) >= COMPACT_MIN_LENGTH:
+        encoded = _encode_typed_array(value)
+        if encoded is not None:
+            return encoded
+    return value
+
+
+def _encode_typed_array(value):
+    """Kodiert eine numerische Reihe als base64 oder gibt None zurück"""
+    array = np.asarray(value) if isinstance(value, np.ndarray) else None
+    if array is None:
+        # Listen nur prüfen, wenn das erste Element eine Zahl ist
+        if isinstance(value[0], (bool, str)) or not isinstance(value[0], (int, float)):
+            return None
+        array = np.asarray(value)
+    if array.ndim != 1 or array.dtype.kind not in 'iuf':
+        return None
+
+    array = _narrowest_lossless(array)
+    little_endian = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    return {
+        'dtype': TYPED_ARRAY_CODES[array.dtype],
+        'bdata': base64.b64encode(little_endian.tobytes()).decode('ascii'),
+    }
+
+
+def _narrowest_lossless(array):
+    """
+    Kleinster Typed-Array-Typ, der alle Werte exakt darstellt: ganzzahlige Werte
+    als Int8/16/32, sonst Float32 wenn verlustfrei, sonst Float64
+    """
+    if array.size == 0:
+        return array.astype(np.float64)
+    if array.dtype.kind == 'f':
+        finite = np.isfinite(array)
+        if finite.all() and np.array_equal(array, np.trunc(array)):
+            low, high = array.min(), array.max()
+            if -2**31 <= low and high < 2**31:
+                return _narrowest_int(array, low, high)
+        if array.dtype != np.float32:
+            narrow = array.astype(np.float32)
+            if np.array_equal(narrow.astype(array.dtype), array, equal_nan=True):
+                return narrow
+        return array.astype(np.float64) if array.dtype != np.float32 else array
+    low, high = array.min(), array.max()
+    if -2**31 <= low and high < 2**31:
+        return _narrowest_int(array, low, high)
+    return array.astype(np.float64)
+
+
+def _narrowest_int(array, low, high):
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return array.astype(dtype)
+
+
+def _plotly_script_tag(include_plotlyjs):
+    """Script-Tag für plotly.js: eingebettet, vom CDN oder als Pfad"""
+    if include_plotlyjs is True:
+        return f'<script type="text/javascript">{get_plotlyjs()}</script>'
+    if include_plotlyjs == 'cdn':
+        src = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+    else:
+        src = include_plotlyjs
+    return f'<script src="{src}" charset="utf-8"></script>'
+
+
+def prune_previews(max_files=MAX_PREVIEW_FILES, max_bytes=MAX_PREVIEW_BYTES):
+    """Löscht die ältesten Vorschaudateien, bis Anzahl und Größe in den Grenzen liegen"""
+    directory = preview_dir()
+    entries = []
+    for name in os.listdir(directory):
+        if not (name.startswith(PREVIEW_PREFIX) and name.endswith('.html')):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort(reverse=True)
+    total = 0
+    for count, (_, size, path) in enumerate(entries, start=1):
+        total += size
+        if count > max_files or total > max_bytes:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,124 @@
+from PyQt5.QtCore import QUrl, QTimer
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+import os
+
+# Seite, die plotly.js einmal lädt; danach werden nur noch Daten bzw. Layout übergeben
+HOST_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8" />
+<script src="{plotly_js}" charset="utf-8"></script>
+<style>html, body, #chart {{ margin: 0; height: 100%; width: 100%; }}</style>
+</head>
+<body>
+<div id="chart"></div>
+<script type="text/javascript">
+{decoder}
+var chart = document.getElementById('chart');
+var currentData = [];
+function fitLayout(layout) {{
+    // Die Höhe richtet sich nach der eingebetteten Ansicht, nicht nach dem Export
+    delete layout.height;
+    layout.autosize = true;
+    return layout;
+}}
+function renderChart(data, layout) {{
+    currentData = decodeTypedArrays(data);
+    Plotly.react(chart, currentData, fitLayout(layout), {{responsive: true}});
+}}
+function updateLayout(layout) {{
+    Plotly.react(chart, currentData, fitLayout(layout), {{responsive: true}});
+}}
+function extendChart(update, maxPoints) {{
+    // Neue Punkte an die erste Trace anhängen; höchstens maxPoints behalten (0 = alle)
+    update = decodeTypedArrays(update);
+    var trace = chart.data[0];
+    Object.keys(update).forEach(function (key) {{
+        // Typisierte Arrays würden größere Werte abschneiden, daher normale Arrays
+        if (ArrayBuffer.isView(trace[key])) {{
+            trace[key] = Array.from(trace[key]);
+        }}
+        update[key] = [Array.from(update[key])];
+    }});
+    if (maxPoints > 0) {{
+        Plotly.extendTraces(chart, update, [0], maxPoints);
+    }} else {{
+        Plotly.extendTraces(chart, update, [0]);
+    }}
+}}
+</script>
+</body>
+</html>
+"""
+
+
+class ChartView(QWebEngineView):
+    """
+    Eingebettete Diagrammanzeige. plotly.js wird nur einmal geladen; neue Diagramme
+    werden per Plotly.react gezeichnet und reine Beschriftungsänderungen übertragen
+    nur das Layout.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data_key = None
+        self._ready = False
+        self._pending = []
+        self.loadFinished.connect(self._on_load_finished)
+        # Erst nach dem Anzeigen des Fensters laden, um den Start nicht zu bremsen
+        QTimer.singleShot(0, self._load_host_page)
+
+    def _load_host_page(self):
+        self.load(QUrl.fromLocalFile(self._write_host_page()))
+
+    def _write_host_page(self):
+        """Schreibt die Host-Seite neben das gemeinsame plotly.js"""
+        from chart_output import DECODER_JS, ensure_plotly_js, plotly_js_name, preview_dir
+        ensure_plotly_js()
+        path = os.path.join(preview_dir(), "chart-view.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(HOST_PAGE.format(plotly_js=plotly_js_name(), decoder=DECODER_JS))
+        return path
+
+    def show_figure(self, fig, data_key, data_json=None):
+        """
+        Zeigt fig an. Ist data_key unverändert, wird nur das Layout übertragen,
+        sonst Daten und Layout. data_json kann bereits serialisierte Traces
+        enthalten; zurückgegeben wird das verwendete Trace-JSON (oder None).
+        """
+        from chart_output import figure_json, traces_json
+        from profiling import span
+        layout = figure_json(fig.layout.to_plotly_json())
+        if data_key is not None and data_key == self.data_key:
+            self._run(f"updateLayout({layout});")
+            return data_json
+        if data_json is None:
+            with span("Daten serialisieren"):
+                data_json = traces_json(fig)
+        self.data_key = data_key
+        self._run(f"renderChart({data_json}, {layout});")
+        return data_json
+
+    def extend_traces(self, update, data_key, max_points=0):
+        """
+        Hängt neue Punkte an die angezeigte Trace an (Plotly.extendTraces), statt das
+        Diagramm neu zu zeichnen. update: {'x': werte, 'y': werte}; data_key
+        beschreibt die Daten danach.
+        """
+        from chart_output import encode_arrays, figure_json
+        self.data_key = data_key
+        self._run(f"extendChart({figure_json(encode_arrays(update))}, {int(max_points)});")
+
+    def _run(self, script):
+        """Führt das Skript aus, sobald die Seite (und plotly.js) geladen ist"""
+        if self._ready:
+            self.page().runJavaScript(script)
+        else:
+            self._pending.append(script)
+
+    def _on_load_finished(self, ok):
+        self._ready = ok
+        if ok:
+            for script in self._pending:
+                self.page().runJavaScript(script)
+            self._pending = []
@@ -0,0 +1,101 @@
+"""
+Zwischenspeicher für eingelesene Tabellen als Feather-Dateien im App-Cache.
+Schlüssel ist Pfad + Größe + Änderungszeit der Quelldatei, verdrängt wird nach LRU.
+"""
+
+import hashlib
+import os
+from app_paths import cache_dir
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Obergrenze für die Gesamtgröße des Caches (überschreibbar per Umgebungsvariable)
+MAX_CACHE_BYTES = int(os.environ.get("DIAGRAMM_TABLE_CACHE_MB", "2048")) * 1024 * 1024
+
+SUFFIX = ".feather"
+
+
+def is_available():
+    """Der Cache benötigt pyarrow"""
+    return feather is not None
+
+
+def cache_path(file_path):
+    """Pfad der Cache-Datei für den aktuellen Stand der Quelldatei"""
+    stat = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir("tables"), digest + SUFFIX)
+
+
+def load(file_path, columns=None):
+    """Liefert den zwischengespeicherten DataFrame oder None"""
+    if not is_available():
+        return None
+    path = cache_path(file_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        if columns is not None:
+            # Fehlende Spalten sind kein Fehler der Cache-Datei
+            names = feather.read_table(path, memory_map=True).schema.names
+            if any(c not in names for c in columns):
+                return None
+        df = feather.read_feather(path, columns=columns)
+    except Exception:
+        # Beschädigte oder unvollständige Cache-Datei verwerfen
+        _remove(path)
+        return None
+    # Zugriffszeit aktualisieren, damit die LRU-Verdrängung sie berücksichtigt
+    os.utime(path)
+    return df
+
+
+def store(file_path, df):
+    """Schreibt den DataFrame in den Cache; Fehler werden ignoriert"""
+    if not is_available():
+        return
+    # Feather verlangt Spaltennamen als Text
+    if not all(isinstance(c, str) for c in df.columns):
+        return
+    path = cache_path(file_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        feather.write_feather(df.reset_index(drop=True), tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        _remove(tmp_path)
+        return
+    evict()
+
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    """Löscht die am längsten nicht genutzten Einträge, bis die Obergrenze passt"""
+    directory = cache_dir("tables")
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(SUFFIX):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        _remove(path)
+        total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
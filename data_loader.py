@@ -0,0 +1,341 @@
+"""
+Einlesen von Tabellendaten (CSV, Excel, Parquet, Feather) in Blöcken mit Fortschrittsmeldung und Abbruch
+"""
+
+import io
+import os
+import numpy as np
+import pandas as pd
+import data_cache
+from profiling import span
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pa_parquet
+    import pyarrow.feather as pa_feather
+except ImportError:
+    pa = None
+
+# Anzahl Zeilen pro eingelesenem Block
+CHUNK_ROWS = 100_000
+
+# Blockgröße für den pyarrow-CSV-Leser
+ARROW_BLOCK_BYTES = 16 * 1024 * 1024
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.xls', '.parquet', '.feather')
+
+
+class LoadCancelled(Exception):
+    """Wird ausgelöst, wenn das Laden vom Benutzer abgebrochen wurde"""
+
+
+class _BoundedFile(io.RawIOBase):
+    """
+    Liest höchstens limit Bytes einer Datei. Während des Lesens angehängte Zeilen
+    werden so nicht mehr mitgelesen, sondern später beim Verfolgen der Datei.
+    """
+
+    def __init__(self, f, limit):
+        self._file = f
+        self._remaining = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        count = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= count
+        return count
+
+    def tell(self):
+        return self._file.tell()
+
+
+def read_header(file_path):
+    """Liest nur die Kopfzeile und gibt die Spaltennamen zurück"""
+    if file_path.endswith('.csv'):
+        return list(pd.read_csv(file_path, nrows=0).columns)
+    elif file_path.endswith('.xlsx'):
+        return _read_xlsx_header(file_path)
+    elif file_path.endswith('.xls'):
+        return [str(c) for c in pd.read_excel(file_path, nrows=0).columns]
+    elif file_path.endswith('.parquet'):
+        _require_arrow()
+        return list(pa_parquet.read_schema(file_path).names)
+    elif file_path.endswith('.feather'):
+        _require_arrow()
+        return list(pa_feather.read_table(file_path, memory_map=True).schema.names)
+    raise ValueError("Nicht unterstütztes Dateiformat")
+
+
+def read_table(file_path, usecols=None, on_header=None, on_progress=None,
+               is_cancelled=None, use_cache=True):
+    """
+    Lädt eine Datei blockweise in einen DataFrame.
+
+    Mit usecols werden nur die angegebenen Spalten gelesen.
+
+    on_header(spalten) wird aufgerufen, sobald die Kopfzeile gelesen ist,
+    on_progress(zeilen, bytes_gelesen, bytes_gesamt) nach jedem Block.
+    Liefert is_cancelled() True, wird LoadCancelled ausgelöst.
+    CSV- und Excel-Dateien werden im Tabellen-Cache abgelegt und bei
+    unveränderter Datei von dort geladen.
+    """
+    on_header = on_header or (lambda columns: None)
+    on_progress = on_progress or (lambda rows, done, total: None)
+    is_cancelled = is_cancelled or (lambda: False)
+
+    usecols = list(usecols) if usecols is not None else None
+    cacheable = use_cache and file_path.endswith(('.csv', '.xlsx', '.xls'))
+    if cacheable:
+        with span("Tabellen-Cache lesen"):
+            df = data_cache.load(file_path, columns=usecols)
+        if df is not None:
+            size = os.path.getsize(file_path)
+            df.attrs['source_bytes'] = size
+            on_header(list(df.columns))
+            on_progress(len(df), size, size)
+            return df
+
+    with span("Datei lesen", file=os.path.basename(file_path)):
+        df = _read_uncached(file_path, usecols, on_header, on_progress, is_cancelled)
+    # Nur vollständige Tabellen kommen in den Cache, und nur, wenn die Datei
+    # beim Lesen nicht gewachsen ist (der Cache-Schlüssel gilt für den neuen Stand)
+    source_bytes = df.attrs.get('source_bytes')
+    if (cacheable and usecols is None
+            and (source_bytes is None or source_bytes == os.path.getsize(file_path))):
+        with span("Tabellen-Cache schreiben"):
+            data_cache.store(file_path, df)
+    return df
+
+
+def read_columns(file_path, columns, on_progress=None, is_cancelled=None, use_cache=True):
+    """Lädt nur die angegebenen Spalten und verkleinert deren Datentypen"""
+    df = read_table(file_path, usecols=columns, on_progress=on_progress,
+                    is_cancelled=is_cancelled, use_cache=use_cache)
+    with span("Datentypen verkleinern"):
+        return optimize_dtypes(df[list(columns)])
+
+
+def optimize_dtypes(df, category_ratio=0.5):
+    """
+    Verkleinert Zahlenspalten auf den kleinsten verlustfreien Typ und speichert
+    Textspalten mit wenigen verschiedenen Werten als Kategorien.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series):
+            downcast = series.astype(np.float32)
+            # Nur verkleinern, wenn dabei keine Genauigkeit verloren geht
+            if np.array_equal(downcast.to_numpy(np.float64), series.to_numpy(np.float64),
+                              equal_nan=True):
+                df[col] = downcast
+        elif series.dtype == object and len(series):
+            if series.nunique(dropna=True) <= category_ratio * len(series):
+                # Reihenfolge des ersten Auftretens beibehalten (z. B. Monate)
+                categories = pd.unique(series.dropna())
+                df[col] = pd.Categorical(series, categories=categories)
+    return df
+
+
+def _read_uncached(file_path, usecols, on_header, on_progress, is_cancelled):
+    """Wählt den passenden Leser für das Dateiformat"""
+    if file_path.endswith('.csv'):
+        if pa is not None:
+            return _read_csv_arrow(file_path, usecols, on_header, on_progress, is_cancelled)
+        return _read_csv_chunked(file_path, usecols, on_header, on_progress, is_cancelled)
+    elif file_path.endswith('.parquet'):
+        return _read_parquet(file_path, usecols, on_header, on_progress, is_cancelled)
+    elif file_path.endswith('.feather'):
+        _require_arrow()
+        on_header(read_header(file_path))
+        df = pa_feather.read_feather(file_path, columns=usecols)
+        size = os.path.getsize(file_path)
+        on_progress(len(df), size, size)
+        return df
+    elif file_path.endswith('.xlsx'):
+        return _read_xlsx_chunked(file_path, usecols, on_header, on_progress, is_cancelled)
+    elif file_path.endswith('.xls'):
+        # Altes Excel-Format lässt sich nicht blockweise lesen
+        on_header(read_header(file_path))
+        df = pd.read_excel(file_path, usecols=usecols)
+        df.columns = [str(c) for c in df.columns]
+        if is_cancelled():
+            raise LoadCancelled()
+        size = os.path.getsize(file_path)
+        on_progress(len(df), size, size)
+        return df
+    raise ValueError("Nicht unterstütztes Dateiformat")
+
+
+def _require_arrow():
+    if pa is None:
+        raise ValueError("Für Parquet- und Feather-Dateien wird pyarrow benötigt")
+
+
+def _read_csv_arrow(file_path, usecols, on_header, on_progress, is_cancelled):
+    """
+    Liest eine CSV-Datei blockweise mit dem pyarrow-Leser. Bei Dateien, die
+    pyarrow nicht versteht (z. B. kurze Zeilen oder wechselnde Typen), wird auf
+    den nachsichtigeren pandas-Leser zurückgegriffen.
+    """
+    total = os.path.getsize(file_path)
+    # Spaltennamen wie bei pandas ("Unnamed: 0", "a.1"), damit Kopfzeile, Leser,
+    # Tabellen-Cache und das Verfolgen der Datei dieselben Namen verwenden
+    header = read_header(file_path)
+    read_options = pa_csv.ReadOptions(block_size=ARROW_BLOCK_BYTES, column_names=header,
+                                      skip_rows=1)
+    convert_options = pa_csv.ConvertOptions(include_columns=usecols)
+
+    batches = []
+    rows = 0
+    try:
+        with open(file_path, 'rb') as f:
+            bounded = _BoundedFile(f, total)
+            reader = pa_csv.open_csv(bounded, read_options=read_options,
+                                     convert_options=convert_options)
+            on_header(header)
+            for batch in reader:
+                if is_cancelled():
+                    raise LoadCancelled()
+                batches.append(batch)
+                rows += batch.num_rows
+                on_progress(rows, min(bounded.tell(), total), total)
+    except pa.ArrowInvalid:
+        if is_cancelled():
+            raise LoadCancelled()
+        return _read_csv_chunked(file_path, usecols, on_header, on_progress, is_cancelled,
+                                 limit=total)
+    df = pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
+    df.attrs['source_bytes'] = total
+    return df
+
+
+def _read_parquet(file_path, usecols, on_header, on_progress, is_cancelled):
+    """Liest eine Parquet-Datei in Blöcken von CHUNK_ROWS Zeilen"""
+    _require_arrow()
+    total = os.path.getsize(file_path)
+    parquet_file = pa_parquet.ParquetFile(file_path)
+    on_header(list(parquet_file.schema_arrow.names))
+
+    batches = []
+    rows = 0
+    total_rows = max(parquet_file.metadata.num_rows, 1)
+    for batch in parquet_file.iter_batches(batch_size=CHUNK_ROWS, columns=usecols):
+        if is_cancelled():
+            raise LoadCancelled()
+        batches.append(batch)
+        rows += batch.num_rows
+        on_progress(rows, int(total * rows / total_rows), total)
+    if not batches:
+        return parquet_file.read(columns=usecols).to_pandas()
+    return pa.Table.from_batches(batches).to_pandas()
+
+
+def _read_csv_chunked(file_path, usecols, on_header, on_progress, is_cancelled, limit=None):
+    """
+    Liest eine CSV-Datei in Blöcken von CHUNK_ROWS Zeilen, höchstens die ersten
+    limit Bytes (Standard: die beim Start vorhandenen)
+    """
+    total = os.path.getsize(file_path) if limit is None else limit
+    on_header(read_header(file_path))
+
+    chunks = []
+    rows = 0
+    with open(file_path, 'rb') as f:
+        bounded = _BoundedFile(f, total)
+        for chunk in pd.read_csv(bounded, usecols=usecols, chunksize=CHUNK_ROWS):
+            if is_cancelled():
+                raise LoadCancelled()
+            chunks.append(chunk)
+            rows += len(chunk)
+            on_progress(rows, min(bounded.tell(), total), total)
+
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.read_csv(file_path, usecols=usecols)
+    # Bis hierhin ist die Datei gelesen; beim Verfolgen geht es dort weiter
+    df.attrs['source_bytes'] = total
+    return df
+
+
+def _xlsx_columns(header):
+    """Spaltennamen aus der ersten Zeile eines Tabellenblatts"""
+    return [
+        str(name) if name is not None else f"Unnamed: {i}"
+        for i, name in enumerate(header)
+    ]
+
+
+def _read_xlsx_header(file_path):
+    """Liest nur die erste Zeile einer xlsx-Datei"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        header = next(workbook.worksheets[0].iter_rows(values_only=True), None)
+    finally:
+        workbook.close()
+    return _xlsx_columns(header) if header is not None else []
+
+
+def _read_xlsx_chunked(file_path, usecols, on_header, on_progress, is_cancelled):
+    """Liest das erste Tabellenblatt einer xlsx-Datei zeilenweise über openpyxl"""
+    from openpyxl import load_workbook
+
+    total = os.path.getsize(file_path)
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        row_iter = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(row_iter, None)
+        if header is None:
+            return pd.DataFrame()
+        all_columns = _xlsx_columns(header)
+        on_header(all_columns)
+
+        if usecols is None:
+            columns = all_columns
+            select = None
+        else:
+            missing = [c for c in usecols if c not in all_columns]
+            if missing:
+                raise ValueError(f"Spalten nicht gefunden: {', '.join(missing)}")
+            indices = [all_columns.index(c) for c in usecols]
+            columns = list(usecols)
+            select = lambda row: tuple(row[i] if i < len(row) else None for i in indices)
+
+        chunks = []
+        block = []
+        rows = 0
+        for row in row_iter:
+            block.append(row if select is None else select(row))
+            if len(block) >= CHUNK_ROWS:
+                if is_cancelled():
+                    raise LoadCancelled()
+                chunks.append(pd.DataFrame(block, columns=columns))
+                rows += len(block)
+                block = []
+                # Die Bytes lassen sich bei xlsx nicht zuordnen, daher nur Zeilen
+                on_progress(rows, 0, total)
+        if block:
+            chunks.append(pd.DataFrame(block, columns=columns))
+            rows += len(block)
+    finally:
+        workbook.close()
+
+    if is_cancelled():
+        raise LoadCancelled()
+    on_progress(rows, total, total)
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
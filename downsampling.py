@@ -0,0 +1,158 @@
+"""
+Vektorisierte Ausdünnung großer Datenreihen für die Darstellung (LTTB, Min/Max, Streupunkte)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Kleinstes sinnvolles Punktbudget: erster und letzter Punkt plus ein Bucket mit Min/Max
+MIN_POINT_BUDGET = 4
+
+
+def axis_values(series):
+    """Wandelt eine Achsenspalte in Gleitkommazahlen für die Auswahl der Punkte um"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.to_numpy('datetime64[ns]').view(np.int64).astype(np.float64)
+        values[series.isna().to_numpy()] = np.nan
+        return values
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    # Text und Kategorien: Codes der Werte in Reihenfolge des Auftretens
+    codes, _ = pd.factorize(series)
+    return codes.astype(np.float64)
+
+
+def line_x_values(series):
+    """
+    X-Werte für Linien: die echten Werte, wenn sie aufsteigend sortiert sind,
+    sonst die Zeilenposition (so werden die Linien auch gezeichnet)
+    """
+    values = axis_values(series)
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+        if not np.isnan(values).any() and np.all(np.diff(values) >= 0):
+            return values
+    return np.arange(len(values), dtype=np.float64)
+
+
+def _bucket_edges(n, n_buckets):
+    """Grenzen gleich großer Buckets über die inneren Punkte 1..n-2"""
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+
+def _first_per_bucket(mask, bucket):
+    """Index des ersten markierten Punktes je Bucket"""
+    candidates = np.flatnonzero(mask)
+    _, first = np.unique(bucket[candidates], return_index=True)
+    return candidates[first]
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets, vollständig vektorisiert.
+
+    Als linker Ankerpunkt dient der Mittelwert des vorherigen Buckets statt
+    des zuvor gewählten Punktes; dadurch lassen sich alle Buckets auf einmal
+    berechnen. Erster und letzter Punkt bleiben immer erhalten.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    n_buckets = n_out - 2
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    inner = np.arange(1, n - 1)
+    bucket = np.repeat(np.arange(n_buckets), counts)
+
+    mean_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    # Anker links: vorheriger Bucket (bzw. erster Punkt), rechts: nächster Bucket (bzw. letzter Punkt)
+    a_x = np.concatenate(([x[0]], mean_x[:-1]))
+    a_y = np.concatenate(([y[0]], mean_y[:-1]))
+    c_x = np.concatenate((mean_x[1:], [x[-1]]))
+    c_y = np.concatenate((mean_y[1:], [y[-1]]))
+
+    px, py = x[inner], y[inner]
+    ax, ay = a_x[bucket], a_y[bucket]
+    area = np.abs((ax - c_x[bucket]) * (py - ay) - (ax - px) * (c_y[bucket] - ay))
+
+    max_area = np.maximum.reduceat(area, starts - 1)
+    chosen = inner[_first_per_bucket(area == max_area[bucket], bucket)]
+    return np.concatenate(([0], chosen, [n - 1]))
+
+
+def minmax_indices(y, n_out):
+    """Behält je Bucket den kleinsten und den größten Wert (ca. n_out Punkte)"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2
+    edges = _bucket_edges(n, n_buckets)
+    starts = edges[:-1]
+    inner = np.arange(1, n - 1)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    values = y[1:n - 1]
+
+    lows = inner[_first_per_bucket(values == np.minimum.reduceat(values, starts - 1)[bucket], bucket)]
+    highs = inner[_first_per_bucket(values == np.maximum.reduceat(values, starts - 1)[bucket], bucket)]
+    # Zeitliche Reihenfolge beibehalten, Duplikate (min == max) entfernen
+    return np.unique(np.concatenate(([0], lows, highs, [n - 1])))
+
+
+def scatter_indices(x, y, n_out, grid=256, seed=0):
+    """
+    Dichteerhaltende Ausdünnung für Streudiagramme.
+
+    Die Punkte werden in ein grid x grid Raster einsortiert; jede Zelle behält
+    denselben Anteil ihrer Punkte, mindestens aber einen. Dichte Bereiche bleiben
+    so dicht, einzelne Ausreißer gehen nicht verloren.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+
+    def cell_coordinate(values):
+        low, high = np.nanmin(values), np.nanmax(values)
+        span = high - low if high > low else 1.0
+        return np.clip(((values - low) / span * grid).astype(np.int64), 0, grid - 1)
+
+    cell = cell_coordinate(x) * grid + cell_coordinate(y)
+
+    # Zufällige Reihenfolge innerhalb jeder Zelle, dann Rang je Zelle bestimmen
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(n)
+    order = order[np.argsort(cell[order], kind='stable')]
+    sorted_cells = cell[order]
+    group_start = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    group_size = np.diff(np.r_[group_start, n])
+    rank = np.arange(n) - np.repeat(group_start, group_size)
+
+    ratio = n_out / n
+    quota = np.maximum(1, np.ceil(group_size * ratio)).astype(np.int64)
+    keep = order[rank < np.repeat(quota, group_size)]
+    if len(keep) > n_out:
+        keep = rng.choice(keep, n_out, replace=False)
+    return np.sort(keep)
+
+
+def downsample(df, x_col, y_col, n_out, method):
+    """
+    Dünnt df für die Darstellung auf höchstens etwa n_out Zeilen aus.
+    method: 'lttb' oder 'minmax' für Linien, 'scatter' für Streudiagramme.
+    Kleinere Budgets als MIN_POINT_BUDGET werden darauf angehoben.
+    """
+    # Sonst würden die Verfahren bei 1 bis 3 Punkten alle Zeilen zurückgeben
+    n_out = max(n_out, MIN_POINT_BUDGET)
+    data = df.dropna(subset=[y_col])
+    if len(data) <= n_out:
+        return data
+    y = axis_values(data[y_col])
+    if method == 'scatter':
+        indices = scatter_indices(axis_values(data[x_col]), y, n_out)
+    elif method == 'minmax':
+        indices = minmax_indices(y, n_out)
+    else:
+        indices = lttb_indices(line_x_values(data[x_col]), y, n_out)
+    return data.iloc[indices]
@@ -0,0 +1,140 @@
+"""
+LRU-Cache für erstellte Figuren, begrenzt nach geschätztem Speicherbedarf
+"""
+
+import hashlib
+import sys
+from collections import OrderedDict
+
+# Obergrenze für alle zwischengespeicherten Figuren zusammen
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Zeilen, die in den Fingerabdruck eines DataFrames eingehen
+FINGERPRINT_SAMPLES = 1024
+
+# Zuschlag je Figur für Layout, Template und Verwaltung
+ENTRY_OVERHEAD_BYTES = 64 * 1024
+
+# Werte, aus denen die Größe von Text- und Objektspalten hochgerechnet wird
+SIZE_SAMPLES = 1024
+
+
+def data_fingerprint(df, columns):
+    """
+    Günstiger Fingerabdruck der verwendeten Spalten: Zeilenzahl, Datentypen und ein
+    Hash über gleichmäßig verteilte Stichprobenzeilen. Gibt None zurück, wenn eine
+    Spalte (noch) nicht geladen ist.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if df is None or any(c not in df.columns for c in columns):
+        return None
+    n = len(df)
+    positions = np.unique(np.linspace(0, n - 1, min(n, FINGERPRINT_SAMPLES)).astype(np.int64))
+    digest = hashlib.sha1(str(n).encode())
+    for col in dict.fromkeys(columns):
+        series = df[col]
+        digest.update(f"{col}:{series.dtype}".encode())
+        if n:
+            sample = series.iloc[positions]
+            digest.update(pd.util.hash_pandas_object(sample, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class CachedFigure:
+    """Eine Figur mit ChartInfo und (sobald erzeugt) dem serialisierten Trace-JSON"""
+
+    def __init__(self, fig, info, data_bytes):
+        self.fig = fig
+        self.info = info
+        self.data_bytes = data_bytes
+        # Bis das JSON erzeugt ist, wird es so groß wie die Daten geschätzt
+        self.size = ENTRY_OVERHEAD_BYTES + 2 * data_bytes
+        self.data_json = None
+
+
+class FigureCache:
+    """LRU-Cache: Schlüssel -> CachedFigure, verdrängt nach Speicherbedarf"""
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Liefert den Eintrag (und markiert ihn als zuletzt benutzt) oder None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, fig, info):
+        """Legt eine neue Figur ab und verdrängt bei Bedarf die ältesten Einträge"""
+        if key in self._entries:
+            self.size -= self._entries.pop(key).size
+        entry = CachedFigure(fig, info, estimate_data_bytes(fig))
+        self._entries[key] = entry
+        self.size += entry.size
+        self._evict()
+        return entry
+
+    def set_data_json(self, key, data_json):
+        """Speichert das Trace-JSON eines Eintrags und rechnet mit dessen tatsächlicher Größe"""
+        entry = self._entries.get(key)
+        if entry is None or data_json is None or entry.data_json is data_json:
+            return
+        entry.data_json = data_json
+        size = ENTRY_OVERHEAD_BYTES + entry.data_bytes + len(data_json)
+        self.size += size - entry.size
+        entry.size = size
+        self._evict()
+
+    def _evict(self):
+        # Der neueste Eintrag bleibt immer erhalten, auch wenn er allein zu groß ist
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def clear(self):
+        """Verwirft alle Einträge, z. B. nach dem Laden einer neuen Datei"""
+        self._entries.clear()
+        self.size = 0
+
+    def summary(self):
+        """Kurzer Text für die Statusleiste"""
+        return (f"Figuren-Cache: {self.hits} Treffer, {self.misses} neu erstellt, "
+                f"{len(self._entries)} Figuren / {self.size / 1e6:.1f} MB")
+
+
+def estimate_data_bytes(fig):
+    """Schätzt den Speicherbedarf der x- und y-Daten einer Figur"""
+    size = 0
+    for trace in fig.data:
+        for name in ("x", "y"):
+            values = getattr(trace, name, None)
+            if values is not None:
+                size += _values_bytes(values)
+    return size
+
+
+def _values_bytes(values):
+    import numpy as np
+
+    array = np.asarray(values)
+    if array.dtype != object or not array.size:
+        return array.nbytes
+    # Objekt-Arrays enthalten nur Zeiger; die Texte selbst aus Stichproben hochrechnen
+    flat = array.ravel()
+    count = len(flat)
+    positions = np.unique(np.linspace(0, count - 1, min(count, SIZE_SAMPLES)).astype(np.int64))
+    per_value = sum(sys.getsizeof(value) for value in flat[positions]) / len(positions)
+    return array.nbytes + int(per_value * count)
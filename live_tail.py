@@ -0,0 +1,189 @@
+"""
+Verfolgen wachsender CSV-Dateien: liest nur die seit dem letzten Mal angehängten
+Zeilen und hängt sie an einen DataFrame an, ohne die vorhandenen Daten zu kopieren
+"""
+
+import io
+import os
+import numpy as np
+import pandas as pd
+
+# Mindestgröße der Spaltenpuffer in Zeilen
+MIN_CAPACITY = 1024
+
+
+class FileTruncated(Exception):
+    """Die Datei ist kleiner geworden (z. B. neu angelegt) und muss neu geladen werden"""
+
+
+class CsvTail:
+    """
+    Liest die an eine CSV-Datei angehängten Zeilen ab einer Byte-Position.
+    Eine noch unvollständige letzte Zeile bleibt bis zum nächsten Aufruf liegen.
+
+    offset ist das Ende der bereits geladenen Daten. Endet dort eine unvollständige
+    Zeile, die schon als Zeile geladen wurde, wird sie neu gelesen, sobald sie
+    abgeschlossen ist; partial_row zeigt an, dass die erste gelieferte Zeile die
+    zuletzt geladene ersetzt.
+    """
+
+    def __init__(self, file_path, columns, offset=None):
+        self.file_path = file_path
+        self.columns = list(columns)
+        if offset is None:
+            offset = os.path.getsize(file_path)
+        self.offset = _line_start(file_path, offset)
+        self.partial_row = self.offset < offset
+
+    def read_new_rows(self, usecols=None):
+        """Gibt die neuen vollständigen Zeilen als DataFrame zurück oder None"""
+        size = os.path.getsize(self.file_path)
+        if size < self.offset:
+            raise FileTruncated(self.file_path)
+        if size == self.offset:
+            return None
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = data.rfind(b'\n')
+        if end < 0:
+            return None
+        rows = pd.read_csv(io.BytesIO(data[:end + 1]), header=None, names=self.columns,
+                           usecols=usecols)
+        self.offset += end + 1
+        if not rows.empty:
+            self.partial_row = False
+        return rows
+
+
+def _line_start(file_path, offset, block_size=64 * 1024):
+    """Position direkt nach dem letzten Zeilenumbruch vor offset"""
+    with open(file_path, 'rb') as f:
+        end = offset
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            pos = f.read(end - start).rfind(b'\n')
+            if pos >= 0:
+                return start + pos + 1
+            end = start
+    # Nur die Kopfzeile ohne Zeilenumbruch: sie gehört nicht zu den Daten
+    return offset
+
+
+class AppendableFrame:
+    """
+    Spaltenpuffer mit Reservekapazität. append() schreibt neue Zeilen in den freien
+    Platz und liefert einen DataFrame, der die Puffer nur referenziert. Kopiert wird
+    nur, wenn der Platz nicht reicht (Verdopplung) oder das rollende Fenster
+    nach vorne geschoben wird.
+
+    max_rows > 0 begrenzt die Anzahl behaltener Zeilen auf die jüngsten max_rows.
+    """
+
+    def __init__(self, df, max_rows=0):
+        self.max_rows = max_rows
+        if max_rows and len(df) > max_rows:
+            df = df.iloc[-max_rows:]
+        capacity = self._capacity_for(len(df))
+        self._buffers = {}
+        for col in df.columns:
+            values = _column_values(df[col])
+            buffer = np.empty(capacity, dtype=values.dtype)
+            buffer[:len(values)] = values
+            self._buffers[col] = buffer
+        self._start = 0
+        self._stop = len(df)
+
+    def __len__(self):
+        return self._stop - self._start
+
+    @property
+    def columns(self):
+        return list(self._buffers)
+
+    def frame(self):
+        """DataFrame über den belegten Teil der Puffer, ohne Kopie"""
+        return pd.DataFrame(
+            {col: buffer[self._start:self._stop] for col, buffer in self._buffers.items()},
+            copy=False
+        )
+
+    def append(self, rows, replace_last=False):
+        """
+        Hängt die Zeilen aus rows an und gibt den aktualisierten DataFrame zurück.
+        Mit replace_last ersetzt die erste Zeile die bisher letzte.
+        """
+        count = len(rows)
+        if count:
+            if replace_last and len(self):
+                self._stop -= 1
+            if self.max_rows and count > self.max_rows:
+                rows = rows.iloc[-self.max_rows:]
+                count = self.max_rows
+            if self._stop + count > self._capacity:
+                self._make_room(count)
+            stop = self._stop + count
+            for col in self._buffers:
+                values = _new_values(rows[col], self._buffers[col].dtype)
+                buffer = self._buffers[col]
+                dtype = np.result_type(buffer.dtype, values.dtype)
+                if dtype != buffer.dtype:
+                    # Neue Werte passen nicht in den Typ (z. B. Lücken oder größere Ganzzahlen)
+                    buffer = buffer.astype(dtype)
+                    self._buffers[col] = buffer
+                buffer[self._stop:stop] = values
+            self._stop = stop
+            if self.max_rows and len(self) > self.max_rows:
+                self._start = self._stop - self.max_rows
+        return self.frame()
+
+    @property
+    def _capacity(self):
+        return len(next(iter(self._buffers.values()))) if self._buffers else 0
+
+    def _capacity_for(self, rows):
+        if self.max_rows:
+            # Platz für das Fenster plus ebenso viele neue Zeilen bis zum nächsten Verschieben
+            return max(2 * self.max_rows, MIN_CAPACITY)
+        return max(2 * rows, MIN_CAPACITY)
+
+    def _make_room(self, count):
+        """Schiebt die behaltenen Zeilen an den Anfang bzw. vergrößert die Puffer"""
+        if self.max_rows:
+            keep = max(0, min(len(self), self.max_rows - count))
+        else:
+            keep = len(self)
+        capacity = max(self._capacity, self._capacity_for(keep + count))
+        for col, buffer in self._buffers.items():
+            live = buffer[self._stop - keep:self._stop]
+            if capacity > len(buffer):
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:keep] = live
+                self._buffers[col] = grown
+            else:
+                buffer[:keep] = live.copy()
+        self._start = 0
+        self._stop = keep
+
+
+def _column_values(series):
+    """Werte einer Spalte als NumPy-Array für die Puffer"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Neue Zeilen können neue Kategorien bringen
+        return series.astype(object).to_numpy()
+    if pd.api.types.is_datetime64_any_dtype(series) and getattr(series.dtype, 'tz', None) is None:
+        return series.to_numpy('datetime64[ns]')
+    values = series.to_numpy()
+    if values.dtype.kind not in 'biufcM':
+        values = values.astype(object)
+    return values
+
+
+def _new_values(series, dtype):
+    """Werte einer neu gelesenen Spalte passend zum Puffer"""
+    if dtype.kind == 'M':
+        return pd.to_datetime(series, errors='coerce').to_numpy('datetime64[ns]')
+    if dtype.kind == 'O':
+        return series.to_numpy(dtype=object)
+    return _column_values(series)
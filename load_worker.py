@@ -0,0 +1,59 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+import os
+import threading
+from profiling import span
+
+
+class LoadWorker(QObject):
+    """Lädt eine Datei in einem eigenen Thread, damit die Oberfläche bedienbar bleibt"""
+    header_ready = pyqtSignal(list)
+    progress = pyqtSignal(int, int, int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, file_path, usecols=None, header_only=False, use_cache=True):
+        super().__init__()
+        self.file_path = file_path
+        self.usecols = usecols
+        self.header_only = header_only
+        # Ohne Tabellen-Cache wird immer die Datei selbst gelesen (z. B. für Messungen)
+        self.use_cache = use_cache
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        """Wird im Worker-Thread ausgeführt"""
+        # pandas & Co. erst im Worker-Thread laden, nicht beim Programmstart
+        from data_loader import read_table, read_header, read_columns, LoadCancelled
+        try:
+            with span("Datei laden", file=os.path.basename(self.file_path)):
+                if self.header_only:
+                    # Nur die Kopfzeile, die Spalten werden später einzeln geladen
+                    self.header_ready.emit(read_header(self.file_path))
+                    df = None
+                elif self.usecols is not None:
+                    df = read_columns(
+                        self.file_path,
+                        self.usecols,
+                        on_progress=self.progress.emit,
+                        is_cancelled=self._cancel_event.is_set,
+                        use_cache=self.use_cache
+                    )
+                else:
+                    df = read_table(
+                        self.file_path,
+                        on_header=self.header_ready.emit,
+                        on_progress=self.progress.emit,
+                        is_cancelled=self._cancel_event.is_set,
+                        use_cache=self.use_cache
+                    )
+        except LoadCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(df)
+
+    def cancel(self):
+        """Fordert den Abbruch an; wird beim nächsten Block berücksichtigt"""
+        self._cancel_event.set()
@@ -3,21 +3,33 @@ Diagramm-Tool: Desktop-Anwendung zum Erstellen von Diagrammen aus Tabellendaten
 Verwendet PyQt5 für die GUI und Plotly für interaktive Diagramme
 """
 
+import time
+# Bezugspunkt für die Messung der Startzeit
+STARTUP_START = time.perf_counter()
+
 import sys
+import threading
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QComboBox, 
                              QLineEdit, QFileDialog, QMessageBox, QGroupBox,
-                             QSizeGrip, QStatusBar)
-from PyQt5.QtCore import Qt, QPoint
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+                             QSizeGrip, QStatusBar, QCheckBox, QSpinBox)
+from PyQt5.QtCore import Qt, QPoint, QThread, QTimer
 import webbrowser
-import tempfile
 import os
-import base64
 from title_bar import CustomTitleBar
-from ressources import ARROW_ICON_BASE64
+from load_worker import LoadWorker
+from aggregation import AGGREGATIONS
+from chart_builder import (CHART_TYPES, DEFAULT_POINT_BUDGET, DOWNSAMPLE_METHODS,
+                           ChartConfig, build_figure, apply_labels, data_config)
+from figure_cache import FigureCache, data_fingerprint
+from qt_resources import register_app_resources, read_resource_text
+import profiling
+
+try:
+    from chart_view import ChartView
+except ImportError:
+    # Ohne PyQtWebEngine werden Diagramme im Browser angezeigt
+    ChartView = None
 
 class DiagrammTool(QMainWindow):
     def __init__(self):
@@ -25,12 +37,33 @@ class DiagrammTool(QMainWindow):
         # Entfernt die Standard-Fensterleiste
         self.setWindowFlag(Qt.FramelessWindowHint)
         self.df = None
+        self.columns = []
+        self.lazy_path = None
+        self.file_path = None
+        self.load_thread = None
+        self.load_worker = None
+        self.current_fig = None
+        self.current_info = None
+        self.current_data_key = None
+        self.figure_cache = FigureCache()
+        # Wird bei jeder Änderung von self.df erhöht
+        self.data_version = 0
+        self.chart_data_version = 0
+        # Verfolgen wachsender CSV-Dateien
+        self.tail = None
+        self.live_frame = None
+        self.file_offset = 0
+        self.figure_outdated = False
+        self.silent_load = False
         self.init_ui()
     
     def init_ui(self):
         """Initialisiert die Benutzeroberfläche"""
         self.setWindowTitle("Diagramm-Tool")
-        self.setGeometry(100, 100, 800, 350) # Höhe angepasst für Titelleiste
+        if ChartView is not None:
+            self.setGeometry(100, 100, 1000, 900) # Platz für die Diagramm-Anzeige
+        else:
+            self.setGeometry(100, 100, 800, 350) # Höhe angepasst für Titelleiste
         
         # Hauptwidget und Layout
         main_widget = QWidget()
@@ -53,6 +86,11 @@ class DiagrammTool(QMainWindow):
         # Statusleiste für den SizeGrip
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
+        # Aufschlüsselung des letzten Arbeitsschritts, nur mit --profile bzw. --trace
+        self.profile_label = None
+        if profiling.is_enabled():
+            self.profile_label = QLabel()
+            self.status_bar.addPermanentWidget(self.profile_label)
         size_grip = QSizeGrip(self.status_bar)
         self.status_bar.addPermanentWidget(size_grip)
 
@@ -63,9 +101,32 @@ class DiagrammTool(QMainWindow):
         self.file_label = QLabel("Keine Datei geladen")
         self.load_btn = QPushButton("Datei öffnen")
         self.load_btn.clicked.connect(self.load_file)
+        self.cancel_btn = QPushButton("Abbrechen")
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_load)
         
         file_layout.addWidget(self.file_label)
         file_layout.addWidget(self.load_btn)
+        file_layout.addWidget(self.cancel_btn)
+        self.lazy_check = QCheckBox("Nur benötigte Spalten laden")
+        self.lazy_check.setToolTip("Liest zunächst nur die Kopfzeile; die gewählten Spalten "
+                                   "werden beim Erstellen des Diagramms nachgeladen")
+        file_layout.addWidget(self.lazy_check)
+        self.follow_check = QCheckBox("Datei verfolgen")
+        self.follow_check.setEnabled(False)
+        self.follow_check.setToolTip("Liest regelmäßig die neu an die CSV-Datei angehängten "
+                                     "Zeilen ein und ergänzt das Diagramm")
+        self.follow_check.toggled.connect(self.toggle_follow)
+        file_layout.addWidget(self.follow_check)
+        file_layout.addWidget(QLabel("Letzte Zeilen:"))
+        self.window_rows = QSpinBox()
+        self.window_rows.setRange(0, 100_000_000)
+        self.window_rows.setSingleStep(10_000)
+        self.window_rows.setSpecialValueText("Alle")
+        self.window_rows.setToolTip("Beim Verfolgen nur die jüngsten N Zeilen behalten "
+                                    "(0 = alle); gilt ab den nächsten neuen Zeilen")
+        self.window_rows.valueChanged.connect(self.reset_live_frame)
+        file_layout.addWidget(self.window_rows)
         file_group.setLayout(file_layout)
         main_layout.addWidget(file_group)
         
@@ -103,18 +164,46 @@ class DiagrammTool(QMainWindow):
         type_layout = QHBoxLayout()
         type_layout.addWidget(QLabel("Diagrammtyp:"))
         self.chart_type = QComboBox()
-        self.chart_type.addItems([
-            "Liniendiagramm",
-            "Balkendiagramm",
-            "Streudiagramm",
-            "Flächendiagramm",
-            "Balkendiagramm (horizontal)"
-        ])
+        self.chart_type.addItems(CHART_TYPES)
         self.chart_type.setMinimumWidth(200)
         type_layout.addWidget(self.chart_type)
         type_layout.addStretch()
         config_layout.addLayout(type_layout)
         
+        # Ausdünnung großer Datenmengen
+        sampling_layout = QHBoxLayout()
+        sampling_layout.addWidget(QLabel("Max. Punkte:"))
+        self.point_budget = QSpinBox()
+        self.point_budget.setRange(0, 10_000_000)
+        self.point_budget.setSingleStep(10_000)
+        self.point_budget.setValue(DEFAULT_POINT_BUDGET)
+        self.point_budget.setSpecialValueText("Alle")
+        self.point_budget.setToolTip("Größere Linien-, Flächen- und Streudiagramme werden "
+                                     "ausgedünnt und mit WebGL gezeichnet (0 = alle Punkte)")
+        sampling_layout.addWidget(self.point_budget)
+        sampling_layout.addWidget(QLabel("Verfahren:"))
+        self.downsample_method = QComboBox()
+        self.downsample_method.addItems(DOWNSAMPLE_METHODS.keys())
+        sampling_layout.addWidget(self.downsample_method)
+        sampling_layout.addStretch()
+        config_layout.addLayout(sampling_layout)
+        
+        # Aggregation für Balkendiagramme
+        aggregation_layout = QHBoxLayout()
+        aggregation_layout.addWidget(QLabel("Aggregation (Balken):"))
+        self.aggregation = QComboBox()
+        self.aggregation.addItems(AGGREGATIONS.keys())
+        self.aggregation.setToolTip("Fasst die Y-Werte je X-Kategorie zu einem Balken zusammen")
+        aggregation_layout.addWidget(self.aggregation)
+        aggregation_layout.addWidget(QLabel("Top N:"))
+        self.top_n = QSpinBox()
+        self.top_n.setRange(0, 10_000)
+        self.top_n.setSpecialValueText("Alle")
+        self.top_n.setToolTip("Nur die N größten Kategorien zeigen, den Rest als \"Sonstige\"")
+        aggregation_layout.addWidget(self.top_n)
+        aggregation_layout.addStretch()
+        config_layout.addLayout(aggregation_layout)
+        
         # Titel
         title_layout = QHBoxLayout()
         title_layout.addWidget(QLabel("Diagrammtitel:"))
@@ -136,15 +225,53 @@ class DiagrammTool(QMainWindow):
         config_group.setLayout(config_layout)
         main_layout.addWidget(config_group)
         
-        # Der Bereich für die Diagramm-Anzeige wird entfernt
-        
         self.export_btn = QPushButton("Als HTML exportieren")
         self.export_btn.setEnabled(False)
         self.export_btn.clicked.connect(self.export_diagram)
-        main_layout.addWidget(self.export_btn)
+        export_layout = QHBoxLayout()
+        export_layout.addWidget(self.export_btn, 1)
+        self.inline_js_check = QCheckBox("plotly.js einbetten (offline nutzbar)")
+        self.inline_js_check.setChecked(True)
+        self.inline_js_check.setToolTip("Ohne Einbettung lädt die exportierte Datei plotly.js "
+                                        "aus dem Internet und ist ca. 3,5 MB kleiner")
+        export_layout.addWidget(self.inline_js_check)
+        self.compact_check = QCheckBox("Kompakte Datenkodierung")
+        self.compact_check.setChecked(True)
+        self.compact_check.setToolTip("Zahlenreihen als base64-kodierte Binärdaten statt "
+                                      "JSON-Zahlenlisten speichern")
+        export_layout.addWidget(self.compact_check)
+        self.browser_btn = QPushButton("Im Browser öffnen")
+        self.browser_btn.setEnabled(False)
+        self.browser_btn.clicked.connect(self.open_in_browser)
+        export_layout.addWidget(self.browser_btn)
+        main_layout.addLayout(export_layout)
+        
+        # Diagramm-Anzeige; ohne PyQtWebEngine öffnet sich stattdessen der Browser
+        if ChartView is not None:
+            self.chart_view = ChartView()
+            main_layout.addWidget(self.chart_view, 1)
+        else:
+            self.chart_view = None
+            main_layout.addStretch(1)
         
-        # Stretch-Faktor ist nicht mehr nötig
-        main_layout.addStretch(1)
+        # Änderungen der Konfiguration aktualisieren das angezeigte Diagramm
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(200)
+        self.refresh_timer.timeout.connect(self.refresh_chart)
+        if self.chart_view is not None:
+            for combo in (self.x_combo, self.y_combo, self.chart_type,
+                          self.downsample_method, self.aggregation):
+                combo.activated.connect(self.refresh_timer.start)
+            for line_edit in (self.x_label_input, self.y_label_input, self.title_input):
+                line_edit.textEdited.connect(self.refresh_timer.start)
+            for spin_box in (self.point_budget, self.top_n):
+                spin_box.valueChanged.connect(self.refresh_timer.start)
+        
+        # Neue Zeilen der verfolgten Datei einmal pro Sekunde abholen
+        self.follow_timer = QTimer(self)
+        self.follow_timer.setInterval(1000)
+        self.follow_timer.timeout.connect(self.poll_followed_file)
     
     def load_file(self):
         """Lädt eine Datei (CSV oder Excel) und aktualisiert die Spaltenauswahl"""
@@ -152,99 +279,350 @@ class DiagrammTool(QMainWindow):
             self,
             "Datei öffnen",
             "",
-            "Tabellendaten (*.csv *.xlsx *.xls);;CSV (*.csv);;Excel (*.xlsx *.xls);;Alle Dateien (*.*)"
+            "Tabellendaten (*.csv *.xlsx *.xls *.parquet *.feather);;CSV (*.csv);;"
+            "Excel (*.xlsx *.xls);;Parquet/Feather (*.parquet *.feather);;Alle Dateien (*.*)"
         )
         
         if file_path:
-            try:
-                # Datei laden
-                if file_path.endswith('.csv'):
-                    self.df = pd.read_csv(file_path)
-                elif file_path.endswith(('.xlsx', '.xls')):
-                    self.df = pd.read_excel(file_path)
-                else:
-                    raise ValueError("Nicht unterstütztes Dateiformat")
-                
-                # UI aktualisieren
-                self.file_label.setText(f"Geladen: {file_path.split('/')[-1]}")
-                
-                # Spalten in die Comboboxen laden
-                columns = list(self.df.columns)
-                self.x_combo.clear()
-                self.y_combo.clear()
-                self.x_combo.addItems(columns)
-                self.y_combo.addItems(columns)
-                
-                # Standardwerte setzen
-                if len(columns) > 1:
-                    self.y_combo.setCurrentIndex(1)
-                
-                # Button aktivieren
-                self.create_btn.setEnabled(True)
-                
-                QMessageBox.information(
-                    self,
-                    "Erfolg",
-                    f"Datei erfolgreich geladen!\n{len(self.df)} Zeilen, {len(columns)} Spalten"
-                )
-                
-            except Exception as e:
+            from data_loader import SUPPORTED_EXTENSIONS
+            if not file_path.endswith(SUPPORTED_EXTENSIONS):
                 QMessageBox.critical(
                     self,
                     "Fehler",
-                    f"Fehler beim Laden der Datei:\n{str(e)}"
+                    "Fehler beim Laden der Datei:\nNicht unterstütztes Dateiformat"
                 )
+                return
+            self.start_load(file_path)
+    
+    def start_load(self, file_path, usecols=None):
+        """
+        Startet das Laden der Datei in einem Hintergrund-Thread.
+        Mit usecols werden nur diese Spalten nachgeladen (Spalten-Modus).
+        """
+        self.loading_path = file_path
+        self.loading_columns = usecols
+        header_only = usecols is None and self.lazy_check.isChecked()
+        if usecols is None:
+            self.previous_label = self.file_label.text()
+            self.file_label.setText(f"Lade: {file_path.split('/')[-1]}")
+            self.status_bar.showMessage("Lese Kopfzeile...")
+        else:
+            self.status_bar.showMessage(f"Lade Spalten: {', '.join(usecols)}...")
+        self.load_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.create_btn.setEnabled(False)
+        
+        self.load_thread = QThread(self)
+        self.load_worker = LoadWorker(file_path, usecols=usecols, header_only=header_only)
+        self.load_worker.moveToThread(self.load_thread)
+        self.load_thread.started.connect(self.load_worker.run)
+        self.load_worker.header_ready.connect(self.on_header_ready)
+        self.load_worker.progress.connect(self.on_load_progress)
+        self.load_worker.finished.connect(self.on_load_finished)
+        self.load_worker.failed.connect(self.on_load_failed)
+        self.load_worker.cancelled.connect(self.on_load_cancelled)
+        self.load_thread.finished.connect(self.load_worker.deleteLater)
+        self.load_thread.finished.connect(self.load_thread.deleteLater)
+        self.load_thread.start()
+    
+    def cancel_load(self):
+        """Bricht einen laufenden Ladevorgang ab"""
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.status_bar.showMessage("Breche Laden ab...")
+    
+    def on_header_ready(self, columns):
+        """Füllt die Comboboxen, sobald die Kopfzeile gelesen ist"""
+        self.header_columns = [str(c) for c in columns]
+        self.x_combo.clear()
+        self.y_combo.clear()
+        self.x_combo.addItems([str(c) for c in columns])
+        self.y_combo.addItems([str(c) for c in columns])
+        
+        # Standardwerte setzen
+        if len(columns) > 1:
+            self.y_combo.setCurrentIndex(1)
+    
+    def on_load_progress(self, rows, bytes_read, bytes_total):
+        """Zeigt den Ladefortschritt in der Statusleiste an"""
+        message = f"{rows:,} Zeilen gelesen".replace(',', '.')
+        if bytes_read and bytes_total:
+            message += (f" ({bytes_read / 1e6:.1f} von {bytes_total / 1e6:.1f} MB,"
+                        f" {100 * bytes_read / bytes_total:.0f} %)")
+        self.status_bar.showMessage(message)
+    
+    def on_load_finished(self, df):
+        """Übernimmt den geladenen DataFrame im GUI-Thread"""
+        self._reset_load_state()
+        self.show_profile()
+        if self.loading_columns is not None:
+            self._merge_columns(df)
+            return
+        
+        file_path = self.loading_path
+        self.data_version += 1
+        self.figure_cache.clear()
+        self.columns = self.header_columns
+        self.file_path = file_path
+        self.file_label.setText(f"Geladen: {file_path.split('/')[-1]}")
+        self.create_btn.setEnabled(True)
+        silent, self.silent_load = self.silent_load, False
+        
+        # Verfolgen ist nur für vollständig geladene CSV-Dateien möglich
+        followable = df is not None and file_path.endswith('.csv')
+        # Verfolgt wird ab dem Ende der tatsächlich gelesenen Daten
+        self.file_offset = 0
+        if followable:
+            self.file_offset = df.attrs.get('source_bytes', os.path.getsize(file_path))
+        # Neue Daten: die Leseposition der bisher verfolgten Datei gilt nicht mehr
+        self.tail = None
+        self.live_frame = None
+        self.follow_check.setEnabled(followable)
+        if not followable:
+            self.follow_check.setChecked(False)
+        
+        if df is None:
+            # Nur die Kopfzeile wurde gelesen, Spalten folgen bei Bedarf
+            self.df = None
+            self.lazy_path = file_path
+            self.status_bar.showMessage(f"{len(self.columns)} Spalten gefunden")
+            QMessageBox.information(
+                self,
+                "Erfolg",
+                f"Kopfzeile erfolgreich gelesen!\n{len(self.columns)} Spalten, "
+                "die Daten werden beim Erstellen des Diagramms geladen"
+            )
+            return
+        
+        # UI aktualisieren
+        self.df = df
+        self.lazy_path = None
+        columns = list(self.df.columns)
+        if self.x_combo.count() != len(columns):
+            self.on_header_ready(columns)
+            self.columns = self.header_columns
+        
+        self.status_bar.showMessage(f"{len(self.df)} Zeilen, {len(columns)} Spalten geladen")
+        if self.follow_check.isChecked():
+            self.toggle_follow(True)
+        if silent:
+            return
+        
+        QMessageBox.information(
+            self,
+            "Erfolg",
+            f"Datei erfolgreich geladen!\n{len(self.df)} Zeilen, {len(columns)} Spalten"
+        )
+    
+    def _merge_columns(self, df):
+        """Fügt nachgeladene Spalten hinzu und erstellt anschließend das Diagramm"""
+        self.data_version += 1
+        if self.df is None:
+            self.df = df
+        else:
+            for col in df.columns:
+                self.df[col] = df[col]
+        self.create_btn.setEnabled(True)
+        self.status_bar.showMessage(
+            f"{len(self.df)} Zeilen, {len(self.df.columns)} von {len(self.columns)} Spalten geladen"
+        )
+        self.create_diagram()
+    
+    def on_load_failed(self, message):
+        """Meldet einen Fehler beim Laden"""
+        self._reset_load_state()
+        self._restore_after_abort()
+        QMessageBox.critical(
+            self,
+            "Fehler",
+            f"Fehler beim Laden der Datei:\n{message}"
+        )
+    
+    def on_load_cancelled(self):
+        """Stellt den Zustand vor dem abgebrochenen Laden wieder her"""
+        self._reset_load_state()
+        self._restore_after_abort()
+        self.status_bar.showMessage("Laden abgebrochen", 5000)
+    
+    def _reset_load_state(self):
+        """Beendet den Lade-Thread und setzt die Lade-Buttons zurück"""
+        # Der Worker hat sein letztes Signal bereits gesendet, run() ist also fertig
+        self.load_thread.quit()
+        self.load_thread.wait()
+        self.load_worker = None
+        self.load_thread = None
+        self.load_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.status_bar.clearMessage()
+    
+    def _restore_after_abort(self):
+        """Zeigt nach Fehler oder Abbruch wieder die zuvor geladenen Daten an"""
+        self.silent_load = False
+        if self.tail is None:
+            self.follow_check.setChecked(False)
+        if self.loading_columns is not None:
+            # Beim Nachladen von Spalten bleibt die Auswahl unverändert
+            self.create_btn.setEnabled(True)
+            return
+        self.x_combo.clear()
+        self.y_combo.clear()
+        if not self.columns:
+            self.file_label.setText("Keine Datei geladen")
+            return
+        self.file_label.setText(self.previous_label)
+        self.on_header_ready(self.columns)
+        self.create_btn.setEnabled(True)
+    
+    def toggle_follow(self, checked):
+        """Startet bzw. beendet das Verfolgen der geladenen CSV-Datei"""
+        if checked and self.df is not None:
+            # Beim Wiedereinschalten geht es an der zuletzt gelesenen Position weiter
+            if self.tail is None:
+                from live_tail import CsvTail
+                self.tail = CsvTail(self.file_path, self.columns, self.file_offset)
+            self.follow_timer.start()
+        else:
+            self.follow_timer.stop()
+    
+    def reset_live_frame(self):
+        """Die Zeilenbegrenzung wird beim nächsten Anhängen neu angewendet"""
+        self.live_frame = None
+    
+    def poll_followed_file(self):
+        """Liest die neu angehängten Zeilen der verfolgten Datei und ergänzt das Diagramm"""
+        if self.tail is None or self.load_worker is not None:
+            return
+        from live_tail import AppendableFrame, FileTruncated
+        # Die beim Laden unvollständige letzte Zeile wird durch die fertige ersetzt
+        replace_last = self.tail.partial_row
+        try:
+            rows = self.tail.read_new_rows(usecols=list(self.df.columns))
+        except FileTruncated:
+            # Die Datei wurde gekürzt oder neu angelegt: vollständig neu laden
+            self.tail = None
+            self.silent_load = True
+            self.start_load(self.file_path)
+            return
+        except (OSError, ValueError) as e:
+            self.status_bar.showMessage(f"Fehler beim Verfolgen der Datei: {e}", 5000)
+            return
+        if rows is None or rows.empty:
+            return
+        
+        chart_current = self.current_fig is not None and self.chart_data_version == self.data_version
+        if self.live_frame is None:
+            self.live_frame = AppendableFrame(self.df, self.window_rows.value())
+        self.df = self.live_frame.append(rows, replace_last=replace_last)
+        self.data_version += 1
+        self.figure_cache.clear()
+        
+        if chart_current and self.chart_view is not None:
+            if replace_last:
+                # Der zuletzt gezeichnete Punkt hat sich geändert
+                self.create_diagram()
+            else:
+                self._update_followed_chart(min(len(rows), len(self.df)))
+            return
+        # Ohne eingebettete Anzeige wird erst beim nächsten Öffnen bzw. Export neu erstellt
+        if chart_current:
+            self.figure_outdated = True
+            self.chart_data_version = self.data_version
+        self.status_bar.showMessage(f"{len(rows)} neue Zeilen, {len(self.df)} Zeilen gesamt")
+    
+    def _update_followed_chart(self, count):
+        """
+        Hängt die neuen Punkte an das angezeigte Diagramm an, solange es die Zeilen
+        unverändert zeigt; ausgedünnte und aggregierte Diagramme werden neu erstellt.
+        """
+        config = self.current_config()
+        if self.current_data_key is None or data_config(config) != self.current_data_key[-1]:
+            # Die Konfiguration wurde geändert, aber noch nicht gezeichnet
+            self.create_diagram()
+            return
+        extendable = (
+            config.chart_type in ("Liniendiagramm", "Streudiagramm", "Flächendiagramm")
+            and not self.current_info.downsampled
+            and (not config.point_budget or len(self.df) <= config.point_budget)
+            and len(self.current_fig.data) == 1
+        )
+        if not extendable:
+            self.create_diagram()
+            return
+        
+        new_rows = self.df.iloc[-count:]
+        data_key = self.figure_key(config)
+        self.chart_view.extend_traces(
+            {'x': new_rows[config.x_col].to_numpy(), 'y': new_rows[config.y_col].to_numpy()},
+            data_key,
+            self.window_rows.value()
+        )
+        self.current_data_key = data_key
+        self.chart_data_version = self.data_version
+        # Die Python-Figur wird erst bei Bedarf (Export, Browser) neu erstellt
+        self.figure_outdated = True
+        self.current_info.points_total = self.current_info.points_drawn = len(self.df)
+        self.status_bar.showMessage(f"{count} neue Zeilen | {self.current_info.summary()}")
+    
+    def _sync_figure(self):
+        """Erstellt die Figur neu, wenn seit dem Zeichnen Zeilen angehängt wurden"""
+        if self.figure_outdated:
+            self.current_fig, self.current_info = build_figure(self.df, self.current_config())
+            self.figure_outdated = False
+    
+    def closeEvent(self, event):
+        """Beendet einen laufenden Ladevorgang vor dem Schließen"""
+        self.follow_timer.stop()
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+            self.load_thread.quit()
+            self.load_thread.wait()
+        super().closeEvent(event)
     
     def create_diagram(self):
         """Erstellt das Diagramm basierend auf der Konfiguration"""
-        if self.df is None:
+        if self.df is None and self.lazy_path is None:
             return
         
+        x_col = self.x_combo.currentText()
+        y_col = self.y_combo.currentText()
+        if self.lazy_path is not None:
+            # Fehlende Spalten nachladen; create_diagram wird danach erneut aufgerufen
+            loaded = [] if self.df is None else list(self.df.columns)
+            missing = [c for c in dict.fromkeys((x_col, y_col)) if c not in loaded]
+            if missing:
+                self.start_load(self.lazy_path, usecols=missing)
+                return
+        
         try:
-            # Konfiguration auslesen
-            x_col = self.x_combo.currentText()
-            y_col = self.y_combo.currentText()
-            x_label = self.x_label_input.text() or x_col
-            y_label = self.y_label_input.text() or y_col
-            title = self.title_input.text() or f"{y_label} vs {x_label}"
-            chart_type = self.chart_type.currentText()
-            
-            # Diagramm erstellen basierend auf Typ
-            if chart_type == "Liniendiagramm":
-                fig = px.line(self.df, x=x_col, y=y_col, title=title)
-            elif chart_type == "Balkendiagramm":
-                fig = px.bar(self.df, x=x_col, y=y_col, title=title)
-            elif chart_type == "Streudiagramm":
-                fig = px.scatter(self.df, x=x_col, y=y_col, title=title)
-            elif chart_type == "Flächendiagramm":
-                fig = px.area(self.df, x=x_col, y=y_col, title=title)
-            elif chart_type == "Balkendiagramm (horizontal)":
-                fig = px.bar(self.df, x=y_col, y=x_col, orientation='h', title=title)
-                x_label, y_label = y_label, x_label  # Achsen tauschen
-            
-            # Achsenbeschriftungen setzen
-            fig.update_xaxes(title_text=x_label)
-            fig.update_yaxes(title_text=y_label)
-            
-            # Layout anpassen
-            fig.update_layout(
-                hovermode='closest',
-                template='plotly_white',
-                height=600
-            )
-            
-            self.current_fig = fig
+            config = self.current_config()
+            with profiling.span("Diagramm erstellen", chart_type=config.chart_type,
+                                rows=len(self.df)):
+                data_key = self.figure_key(config)
+                entry = self.figure_cache.get(data_key)
+                if entry is None:
+                    fig, info = build_figure(self.df, config)
+                    entry = self.figure_cache.put(data_key, fig, info)
+                else:
+                    # Bereits erstellte Figur wiederverwenden, nur Beschriftungen anpassen
+                    apply_labels(entry.fig, config, entry.info)
+                self.current_fig = entry.fig
+                self.current_info = entry.info
+                self.current_data_key = data_key
+                self.chart_data_version = self.data_version
+                self.figure_outdated = False
             
-            # Temporäre HTML-Datei erstellen und im Browser öffnen
-            with tempfile.NamedTemporaryFile('w', delete=False, suffix='.html', encoding='utf-8') as f:
-                fig.write_html(f)
-                # URL für den Browser erstellen (funktioniert auf allen Systemen)
-                file_url = 'file:///' + os.path.abspath(f.name).replace('\\', '/')
-
-            webbrowser.open(file_url)
+                if self.chart_view is not None:
+                    data_json = self.chart_view.show_figure(entry.fig, data_key, entry.data_json)
+                    self.figure_cache.set_data_json(data_key, data_json)
+                else:
+                    self.open_in_browser()
             
             # Export-Button aktivieren
             self.export_btn.setEnabled(True)
+            self.browser_btn.setEnabled(True)
+            self.status_bar.showMessage(f"{entry.info.summary()} | {self.figure_cache.summary()}")
+            self.show_profile()
             
         except Exception as e:
             QMessageBox.critical(
@@ -253,21 +631,89 @@ class DiagrammTool(QMainWindow):
                 f"Fehler beim Erstellen des Diagramms:\n{str(e)}"
             )
     
+    def refresh_chart(self):
+        """
+        Aktualisiert das angezeigte Diagramm nach einer Änderung der Konfiguration.
+        Reine Beschriftungsänderungen übertragen nur das Layout.
+        """
+        if self.current_fig is None or self.load_worker is not None:
+            return
+        config = self.current_config()
+        data_key = self.figure_key(config)
+        if data_key is not None and data_key == self.current_data_key:
+            apply_labels(self.current_fig, config, self.current_info)
+            self.chart_view.show_figure(self.current_fig, data_key)
+        elif self.chart_data_version == self.data_version:
+            # Nach dem Laden einer neuen Datei erst wieder per Button zeichnen
+            self.create_diagram()
+    
+    def figure_key(self, config):
+        """
+        Schlüssel für Figuren-Cache und Anzeige: Datenstand, Fingerabdruck der verwendeten
+        Spalten und die datenrelevante Konfiguration. None, solange Spalten fehlen.
+        """
+        fingerprint = data_fingerprint(self.df, (config.x_col, config.y_col))
+        if fingerprint is None:
+            return None
+        # Der Fingerabdruck sieht nur Stichprobenzeilen; erst der Datenstand erkennt
+        # eine neu geladene Datei, die sich nur in anderen Zeilen unterscheidet
+        return (self.data_version, fingerprint, data_config(config))
+    
+    def open_in_browser(self):
+        """Schreibt das aktuelle Diagramm als Vorschau-Datei und öffnet es im Browser"""
+        if self.current_fig is None:
+            return
+        self._sync_figure()
+        from chart_output import write_preview
+        with profiling.span("Im Browser öffnen"):
+            preview_path = write_preview(self.current_fig)
+            # URL für den Browser erstellen (funktioniert auf allen Systemen)
+            file_url = 'file:///' + os.path.abspath(preview_path).replace('\\', '/')
+            with profiling.span("Browser starten"):
+                webbrowser.open(file_url)
+        self.show_profile()
+    
+    def show_profile(self):
+        """Zeigt die Zeiten des letzten Arbeitsschritts in der Statusleiste"""
+        if self.profile_label is not None:
+            self.profile_label.setText(profiling.last_breakdown())
+    
+    def current_config(self):
+        """Liest die Diagramm-Konfiguration aus der Oberfläche"""
+        return ChartConfig(
+            x_col=self.x_combo.currentText(),
+            y_col=self.y_combo.currentText(),
+            chart_type=self.chart_type.currentText(),
+            x_label=self.x_label_input.text(),
+            y_label=self.y_label_input.text(),
+            title=self.title_input.text(),
+            point_budget=self.point_budget.value(),
+            downsample_method=DOWNSAMPLE_METHODS[self.downsample_method.currentText()],
+            aggregation=AGGREGATIONS[self.aggregation.currentText()],
+            top_n=self.top_n.value()
+        )
+    
     def export_diagram(self):
         """Exportiert das aktuelle Diagramm als HTML-Datei"""
-        if not hasattr(self, 'current_fig'):
+        if self.current_fig is None:
             return
         
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Diagramm exportieren",
             "diagramm.html",
-            "HTML (*.html);;Alle Dateien (*.*)"
+            "HTML (*.html);;HTML gzip-komprimiert (*.html.gz);;Alle Dateien (*.*)"
         )
         
         if file_path:
             try:
-                self.current_fig.write_html(file_path)
+                with profiling.span("Exportieren", file=os.path.basename(file_path)):
+                    self._sync_figure()
+                    from chart_output import write_export
+                    write_export(self.current_fig, file_path,
+                                 inline_plotlyjs=self.inline_js_check.isChecked(),
+                                 compact=self.compact_check.isChecked())
+                self.show_profile()
                 QMessageBox.information(
                     self,
                     "Erfolg",
@@ -281,30 +727,85 @@ class DiagrammTool(QMainWindow):
                 )
 
 
-def main():
-    app = QApplication(sys.argv)
+def warm_up(timings):
+    """
+    Lädt die schweren Module (pandas, plotly) im Hintergrund vor, solange das
+    Fenster schon bedienbar ist, und räumt alte Vorschaudateien auf
+    """
+    import plotly.express  # noqa: F401
+    import data_loader  # noqa: F401
+    import downsampling  # noqa: F401
+    import chart_output
+    chart_output.prune_previews()
+    timings['warm_up'] = time.perf_counter() - STARTUP_START
+
 
-    # Base64-kodierter Pfeil für das Dropdown-Menü
-    arrow_png_data = base64.b64decode(ARROW_ICON_BASE64)
+def startup_report(timings):
+    """Text zur Startzeit für Statusleiste und Konsole"""
+    text = f"Start: Fenster nach {timings['window'] * 1000:.0f} ms sichtbar"
+    if 'warm_up' in timings:
+        text += f", Module nach {timings['warm_up'] * 1000:.0f} ms geladen"
+    return text
 
-    with open("arrow.png", "wb") as f:
-        f.write(arrow_png_data)
 
-    # Stylesheet aus externer Datei laden
-    try:
-        with open("styles.qss", "r") as f:
-            app.setStyleSheet(f.read())
-    except FileNotFoundError:
-        print("Stylesheet-Datei 'styles.qss' nicht gefunden.")
+def main():
+    # Kommandozeilen-Modus ohne GUI
+    if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        from batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    
+    app = QApplication(sys.argv)
+    
+    # Mit --profile werden die Arbeitsschritte gemessen, mit --trace datei.json
+    # zusätzlich als Chrome-Trace geschrieben, mit --profile-memory auch der
+    # Speicher je Schritt (langsamer)
+    memory = '--profile-memory' in sys.argv
+    if '--trace' in sys.argv:
+        index = sys.argv.index('--trace') + 1
+        # Ohne Dateinamen (z. B. "--trace --profile-memory") in die Standarddatei
+        if index < len(sys.argv) and not sys.argv[index].startswith('-'):
+            trace_path = sys.argv[index]
+        else:
+            trace_path = 'diagramm-trace.json'
+        profiling.enable(trace_path, memory=memory)
+    elif '--profile' in sys.argv or memory:
+        profiling.enable(memory=memory)
+    
+    # Pfeil-Symbol und Stylesheet liegen als Qt-Ressourcen im Speicher
+    register_app_resources()
+    stylesheet = read_resource_text(":/styles.qss")
+    if stylesheet is not None:
+        app.setStyleSheet(stylesheet)
     
     window = DiagrammTool()
     window.show()
     
+    # Startzeit messen, sobald die Ereignisschleife das Fenster gezeichnet hat
+    timings = {}
+    def on_window_shown():
+        timings['window'] = time.perf_counter() - STARTUP_START
+        window.status_bar.showMessage(startup_report(timings), 5000)
+    QTimer.singleShot(0, on_window_shown)
+    
+    warm_up_thread = threading.Thread(target=warm_up, args=(timings,), daemon=True)
+    warm_up_thread.start()
+    
+    # Mit --startup-time werden die Zeiten ausgegeben und das Programm beendet
+    if '--startup-time' in sys.argv:
+        def report_and_quit():
+            if 'window' in timings and not warm_up_thread.is_alive():
+                print(startup_report(timings))
+                app.quit()
+        report_timer = QTimer()
+        report_timer.timeout.connect(report_and_quit)
+        report_timer.start(20)
+    
     exit_code = app.exec_()
     
-    # Temporäre Pfeil-Datei löschen
-    if os.path.exists("arrow.png"):
-        os.remove("arrow.png")
+    # Vorschaudateien begrenzen
+    warm_up_thread.join()
+    from chart_output import prune_previews
+    prune_previews()
         
     sys.exit(exit_code)
 
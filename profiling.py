@@ -0,0 +1,222 @@
+"""
+Zeit- und Speichermessung einzelner Arbeitsschritte (Laden, Figur, Serialisierung,
+Browser, Export) für Statusleiste und Trace-Datei.
+
+Ausgeschaltet (Standard) gibt span() nur einen gemeinsamen leeren Kontext zurück.
+Eingeschaltet wird mit enable(), in der Anwendung per --profile bzw. --trace datei.json.
+Gemessen werden die Dauer und die Speicherspitze des Prozesses am Ende jedes Abschnitts;
+mit --profile-memory zusätzlich der Mehrverbrauch je Abschnitt über tracemalloc, was
+Python-lastige Schritte (z. B. plotly) allerdings deutlich verlangsamt.
+Die Trace-Datei im Chrome-Trace-Format lässt sich in chrome://tracing oder
+https://ui.perfetto.dev öffnen und an Fehlerberichte anhängen.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+try:
+    import resource
+except ImportError:
+    # Windows: Speicherspitze über die Win32-API
+    resource = None
+
+# Höchstens so viele Abschnitte werden für die Trace-Datei aufbewahrt
+MAX_SPANS = 10_000
+
+_enabled = False
+_memory = False
+_trace_path = None
+_lock = threading.Lock()
+_local = threading.local()
+_finished = deque(maxlen=MAX_SPANS)
+_last_root = None
+_origin = time.perf_counter()
+_NULL_SPAN = contextlib.nullcontext()
+
+# tracemalloc.reset_peak() gibt es erst ab Python 3.9; davor zählt nur der Stand am
+# Ende jedes Abschnitts statt seiner Spitze
+_RESET_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+
+class Span:
+    """Ein gemessener Abschnitt mit Dauer, Speicherspitze und Unterabschnitten"""
+
+    def __init__(self, name, args, parent):
+        self.name = name
+        self.args = args
+        self.parent = parent
+        self.children = []
+        self.thread = threading.get_ident()
+        self.start = 0.0
+        self.duration = 0.0
+        self.base_bytes = 0
+        self.peak_bytes = 0
+        self.process_peak = None
+
+    @property
+    def peak_increase(self):
+        """Zusätzlicher Speicher auf dem Höhepunkt gegenüber dem Beginn (Bytes)"""
+        return max(0, self.peak_bytes - self.base_bytes)
+
+
+def enable(trace_path=None, memory=False):
+    """
+    Schaltet die Messung ein. Mit memory wird der Mehrverbrauch je Abschnitt
+    über tracemalloc erfasst; mit trace_path wird nach jedem vollständigen
+    Arbeitsschritt die Trace-Datei geschrieben.
+    """
+    global _enabled, _memory, _trace_path
+    _enabled = True
+    _memory = memory
+    _trace_path = trace_path
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def is_enabled():
+    return _enabled
+
+
+def span(name, **args):
+    """Kontext, der den Abschnitt name misst; args landen in der Trace-Datei"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _measure(name, args)
+
+
+@contextlib.contextmanager
+def _measure(name, args):
+    stack = _stack()
+    parent = stack[-1] if stack else None
+    record = Span(name, args, parent)
+    if parent is not None:
+        parent.children.append(record)
+    if _memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if _RESET_PEAK:
+            # Die Spitze des übergeordneten Abschnitts sichern, bevor sie zurückgesetzt wird
+            if parent is not None:
+                parent.peak_bytes = max(parent.peak_bytes, peak)
+            tracemalloc.reset_peak()
+        record.base_bytes = record.peak_bytes = current
+    stack.append(record)
+    record.start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record.duration = time.perf_counter() - record.start
+        record.process_peak = process_peak_bytes()
+        stack.pop()
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            record.peak_bytes = max(record.peak_bytes, peak if _RESET_PEAK else current)
+            if parent is not None:
+                parent.peak_bytes = max(parent.peak_bytes, record.peak_bytes)
+        _finish(record)
+
+
+def process_peak_bytes():
+    """Bisherige Speicherspitze des Prozesses in Bytes (None, falls unbekannt)"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux meldet KB, macOS Bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t),
+                        ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t),
+                        ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+def _stack():
+    """Offene Abschnitte des aktuellen Threads"""
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _finish(record):
+    global _last_root
+    with _lock:
+        _finished.append(record)
+        if record.parent is None:
+            _last_root = record
+    if record.parent is None and _trace_path:
+        write_trace(_trace_path)
+
+
+def last_breakdown():
+    """Aufschlüsselung des zuletzt abgeschlossenen Arbeitsschritts als Text (oder "")"""
+    with _lock:
+        record = _last_root
+    return breakdown(record) if record is not None else ""
+
+
+def breakdown(record):
+    """z. B. "Diagramm erstellen 2,31 s: Figur erstellen (plotly) 1,20 s, …, Spitze 812 MB" """
+    durations = {}
+    for child in record.children:
+        durations[child.name] = durations.get(child.name, 0.0) + child.duration
+    parts = [f"{name} {_seconds(duration)}" for name, duration in durations.items()]
+    if _memory:
+        parts.append(f"+{record.peak_increase / 1e6:.0f} MB")
+    if record.process_peak is not None:
+        parts.append(f"Spitze {record.process_peak / 1e6:.0f} MB")
+    text = f"{record.name} {_seconds(record.duration)}"
+    return f"{text}: {', '.join(parts)}" if parts else text
+
+
+def _seconds(value):
+    return f"{value:.2f} s".replace('.', ',')
+
+
+def write_trace(path):
+    """Schreibt alle aufbewahrten Abschnitte im Chrome-Trace-Format (JSON)"""
+    with _lock:
+        records = list(_finished)
+    pid = os.getpid()
+    events = []
+    for record in records:
+        args = dict(record.args)
+        if _memory:
+            args['peak_increase_mb'] = round(record.peak_increase / 1e6, 2)
+        if record.process_peak is not None:
+            args['process_peak_mb'] = round(record.process_peak / 1e6, 1)
+        events.append({
+            'name': record.name,
+            'cat': 'diagramm-tool',
+            'ph': 'X',
+            'ts': round((record.start - _origin) * 1e6),
+            'dur': round(record.duration * 1e6),
+            'pid': pid,
+            'tid': record.thread,
+            'args': args,
+        })
+    tmp_path = f"{path}.{pid}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f,
+                  ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
@@ -0,0 +1,69 @@
+"""
+Registriert Symbole und Stylesheet als Qt-Ressourcen im Speicher (":/arrow.png",
+":/styles.qss"), damit nichts ins Arbeitsverzeichnis geschrieben werden muss.
+"""
+
+import base64
+import os
+import struct
+from PyQt5.QtCore import QFile, QIODevice, qRegisterResourceData
+from ressources import ARROW_ICON_BASE64
+
+STYLESHEET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles.qss")
+
+# Qt verweist nur auf die Puffer; sie müssen so lange leben wie die Anwendung
+_registered = []
+
+
+def _qt_hash(name):
+    """Hash-Funktion, nach der Qt die Einträge eines Ressourcen-Verzeichnisses sortiert"""
+    h = 0
+    for code_unit in struct.unpack(f">{len(name)}H", name.encode("utf-16-be")):
+        h = (h << 4) + code_unit
+        h ^= (h & 0xF0000000) >> 23
+        h &= 0x0FFFFFFF
+    return h
+
+
+def register_files(files):
+    """
+    Registriert {name: bytes} als flaches Ressourcen-Verzeichnis unter ":/"
+    (rcc-Format Version 1, wie von pyrcc5 erzeugt).
+    """
+    names = sorted(files, key=_qt_hash)
+    tree = bytearray(struct.pack(">IHII", 0, 2, len(names), 1))  # Wurzelverzeichnis
+    name_table = bytearray()
+    data_table = bytearray()
+    for name in names:
+        name_offset = len(name_table)
+        name_table += struct.pack(">HI", len(name), _qt_hash(name)) + name.encode("utf-16-be")
+        data_offset = len(data_table)
+        data_table += struct.pack(">I", len(files[name])) + files[name]
+        # Datei-Eintrag: Name, Flags, Land, Sprache (C), Daten
+        tree += struct.pack(">IHHHI", name_offset, 0, 0, 1, data_offset)
+
+    buffers = (bytes(tree), bytes(name_table), bytes(data_table))
+    _registered.append(buffers)
+    return qRegisterResourceData(1, *buffers)
+
+
+def register_app_resources():
+    """Registriert den Dropdown-Pfeil und das Stylesheet der Anwendung"""
+    files = {"arrow.png": base64.b64decode(ARROW_ICON_BASE64)}
+    try:
+        with open(STYLESHEET_FILE, "rb") as f:
+            files["styles.qss"] = f.read()
+    except FileNotFoundError:
+        print("Stylesheet-Datei 'styles.qss' nicht gefunden.")
+    return register_files(files)
+
+
+def read_resource_text(path):
+    """Liest eine Textressource wie ":/styles.qss"; None, wenn sie fehlt"""
+    resource = QFile(path)
+    if not resource.open(QIODevice.ReadOnly):
+        return None
+    try:
+        return bytes(resource.readAll()).decode("utf-8")
+    finally:
+        resource.close()